@@ -0,0 +1,14 @@
+"""Configuration for session authentication"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class AuthConfig:
+    """Auth configuration class"""
+    # Seconds the signed user claims in the session cookie are trusted before
+    # they are revalidated against the database
+    CLAIMS_TTL = int(os.getenv('AUTH_CLAIMS_TTL', 300))
+
+    # Bump when the claims layout changes so older cookies are revalidated
+    CLAIMS_VERSION = 1
@@ -0,0 +1,52 @@
+"""Configuration for the shared database runtime"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class DatabaseConfig:
+    """Database configuration class"""
+    # Database location (relative names are resolved inside the data/ directory)
+    DB_NAME = os.getenv('DB_NAME', 'robosite.db')
+
+    # Connection pool sizing, per worker process (writer pool)
+    POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 2))
+    MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 2))
+
+    # Read-only pool used by read-only endpoints (opened with mode=ro)
+    READER_POOL_SIZE = int(os.getenv('DB_READER_POOL_SIZE', 4))
+    READER_MAX_OVERFLOW = int(os.getenv('DB_READER_MAX_OVERFLOW', 4))
+    POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))
+    POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 3600))
+
+    # Log every SQL statement (debugging only)
+    ECHO = os.getenv('DB_ECHO', '0') == '1'
+
+    # Serialized writer: waiting writers allowed, wait time and SQLITE_BUSY retries
+    WRITE_QUEUE_SIZE = int(os.getenv('DB_WRITE_QUEUE_SIZE', 32))
+    WRITE_QUEUE_TIMEOUT = float(os.getenv('DB_WRITE_QUEUE_TIMEOUT', 10))
+    WRITE_MAX_RETRIES = int(os.getenv('DB_WRITE_MAX_RETRIES', 5))
+    WRITE_RETRY_BASE_MS = float(os.getenv('DB_WRITE_RETRY_BASE_MS', 20))
+    WRITE_RETRY_MAX_MS = float(os.getenv('DB_WRITE_RETRY_MAX_MS', 1000))
+
+    # Statements at least this slow (ms) are logged to the 'robosite.sql' logger
+    SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', 100))
+
+    # Rows per page for paged listings (teams and the admin user list)
+    PAGE_SIZE = int(os.getenv('DB_PAGE_SIZE', 50))
+
+    # SQLite PRAGMA profiles, applied in order to every new connection
+    PRAGMA_PROFILES = {
+        # Plain SQLite defaults (rollback journal, no busy timeout)
+        'default': {},
+        # Concurrent readers alongside a writer, for multi-worker deployments
+        'performance': {
+            'busy_timeout': 5000,        # ms to wait on a locked database
+            'journal_mode': 'WAL',       # readers no longer block on writers
+            'synchronous': 'NORMAL',     # safe with WAL, fsync only at checkpoints
+            'cache_size': -65536,        # negative = KiB, so 64 MiB of page cache
+            'mmap_size': 268435456,      # 256 MiB memory-mapped I/O
+            'temp_store': 'MEMORY',      # temp tables and indexes in memory
+        },
+    }
+    PRAGMA_PROFILE = os.getenv('DB_PRAGMA_PROFILE', 'performance')
@@ -0,0 +1,16 @@
+"""Configuration for the full-page response cache"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class PageCacheConfig:
+    """Page cache configuration class"""
+    # Off unless PAGE_CACHE=1; serves the member views' rendered HTML from memory
+    ENABLED = os.getenv('PAGE_CACHE', '0') == '1'
+
+    # Pages kept per worker process, least recently used evicted first
+    MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', 256))
+
+    # Seconds a cached page is served before it is rendered again
+    TTL = float(os.getenv('PAGE_CACHE_TTL', 60))
@@ -1,6 +1,7 @@
 from flask import render_template, request, redirect, url_for, session, flash
 from models.team_model import TeamModel
 from models.user_model import UserModel
+from config.database import DatabaseConfig
 from controllers.base_controller import BaseController
 
 
@@ -14,21 +15,25 @@ class TeamController(BaseController):
         # Get current user from user controller
         current_user = self.get_current_user()
 
-        # Get all teams
-        result = self.team_model.get_all_teams()
+        # One page of teams, and of users for the admin section
+        teams_cursor = request.args.get('teams_after')
+        users_cursor = request.args.get('users_after')
+        result = self.team_model.get_all_teams(limit=DatabaseConfig.PAGE_SIZE, cursor=teams_cursor)
         teams = result['data'] if result['status'] == 'success' else []
         
-        # Get all users for admin section
-        users_result = self.user_model.get_all()
+        users_result = self.user_model.get_all(fields=('email', 'team_id', 'access'),
+                                               limit=DatabaseConfig.PAGE_SIZE, cursor=users_cursor)
         users = users_result['data'] if users_result['status'] == 'success' else []
 
         # get user team name
         user_team_id=current_user["team_id"]
         print("user_team_id: ", user_team_id)
-        user_team_name = self.team_model.get(id=int(current_user["team_id"]))
+        user_team_name = self.team_model.get(id=int(current_user["team_id"]), fields=('name',))
         print(f"self.team_model.get with id {current_user['team_id']} result is ", user_team_name)
         
-        return render_template('team.html', teams=teams, user_team_name=user_team_name["data"]["name"], users=users, user=current_user)
+        return render_template('team.html', teams=teams, user_team_name=user_team_name["data"]["name"], users=users, user=current_user,
+                               teams_cursor=teams_cursor, users_cursor=users_cursor,
+                               teams_next=result.get('next_cursor'), users_next=users_result.get('next_cursor'))
     
     def create(self):
         """Create a new team."""
@@ -23,10 +23,7 @@ class UserController(BaseController):
             flash('Email is required', 'error')
             return redirect(url_for('teams.view'))
         
-        user_google_id=self.user_model.get(email=user_email)["data"]["google_id"]
-
-        
-        user_info = {'google_id': user_google_id}
+        user_info = {'email': user_email}
         if new_team_id:
             user_info['team_id'] = int(new_team_id)
         # if access:
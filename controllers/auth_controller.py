@@ -48,36 +48,18 @@ class AuthController(BaseController):
             from flask import flash
             flash(f"Welcome to Robosite, {user_info['name']}", 'info')
             
-            # does user exist? if so, get team_id
-            exists_result=self.user_model.exists(email=user_info['email'])
-            print("exists_result: ", exists_result)
-            if exists_result["status"] == "success" and exists_result["data"]==True:
-                team_id_result=self.user_model.get(email=user_info['email'])
-                print("team_idresult = ", team_id_result)
-                team_id=team_id_result["data"]["team_id"]
-                access=team_id_result["data"]["access"]
-
-            # default to pigeons team if no team id
-            else:
-                team_id=2 
-                access=2
-
-            # Create/update user in database
-            user_data = {
+            # Create the user (pigeons team, member access) or refresh an existing
+            # one, keeping their team and access, in one statement
+            result = self.user_model.upsert({
                 'google_id': user_info['id'],
                 'name': user_info['name'],
                 'email': user_info['email'],
-                'team_id':team_id,
-                'access': access  # Default to member access
-            }
-            result = self.user_model.create(user_data)
+                'team_id': 2,
+                'access': 2
+            })
             if result['status'] == 'success':
-                session['user'] = result['data']
-                # adding team_name to session['user']
-                session['user']['team_name']=self.team_model.get(id=team_id)['data']['name']
-                
-
-                
+                self.remember_user(result['data'])
+                self.forget_current_user()
                 return redirect(url_for('index'))
             else:
                 return redirect(url_for('index', error="Login failed"))
@@ -89,4 +71,5 @@ class AuthController(BaseController):
     def logout(self):
         """Clear session and logout user"""
         session.clear()
+        self.forget_current_user()
         return redirect(url_for('index'))
@@ -1,11 +1,22 @@
-from flask import redirect, session, url_for, flash, request
+import hashlib
+from flask import redirect, session, url_for, flash, request, g, make_response, render_template
 from google.oauth2 import id_token
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport import requests
 from config.keys import Keys
 from models.user_model import UserModel
+from controllers.session_claims import SessionClaims
+from controllers.fragment_cache import FragmentCache
+from controllers.page_cache import PageCache
 
 class BaseController:
+    # Signs the user snapshot kept in the session cookie
+    session_claims = SessionClaims()
+    # Rendered template fragments, shared by every controller in the worker
+    fragments = FragmentCache()
+    # Opt-in cache of whole member pages (PAGE_CACHE=1)
+    page_cache = PageCache()
+
     def __init__(self, user_model:UserModel):
         self.user_model = user_model
         self.flow = Flow.from_client_config(
@@ -23,6 +34,9 @@ class BaseController:
         )    
     def get_current_user(self):
         """Get current user from session.
+
+        The user is looked up once per request and reused by the middleware,
+        context processors, controllers and templates (see forget_current_user).
             user_data{
                 name:str,
                 team_id:int,
@@ -32,25 +46,124 @@ class BaseController:
                 access:int
             }
         """
+        if 'current_user' not in g:
+            g.current_user = self._load_current_user()
+        return g.current_user
+
+    def forget_current_user(self):
+        """Drop the user cached for this request, e.g. after login or logout"""
+        g.pop('current_user', None)
+
+    def remember_user(self, user):
+        """Store a user fresh from the database in the session, with signed claims"""
+        session['user'] = user
+        session['claims'] = self.session_claims.issue(user)
+
+    def _load_current_user(self):
+        """Resolve the session user, from its signed claims while they are fresh.
+
+        Fresh claims cost one primary key lookup of the user's auth_epoch, so a
+        change to access or team (or removing the user) in any worker process
+        is seen on the next request. The full user is only loaded again once
+        the claims are older than the TTL or their epoch is out of date.
+        """
+        claims = self.session_claims.load(session.get('claims'))
+        if claims and self.session_claims.is_fresh(claims):
+            epoch = self.user_model.get_auth_epoch(claims['google_id'])
+            if epoch['status'] == 'success' and epoch['data'] == claims['auth_epoch']:
+                return self.session_claims.user(claims)
+
         if 'user' in session:
             # Check if user data contains necessary information
             if 'email' in session['user']:
                 # Refresh from database if needed
                 user = self.user_model.get(email=session['user']['email'])
                 if user['status'] == 'success':
-                    session['user'] = user['data']
+                    self.remember_user(user['data'])
                     return user['data']
             elif 'google_id' in session['user']:
                 # Try to get by google_id instead
                 user = self.user_model.get(google_id=session['user']['google_id'])
                 if user['status'] == 'success':
-                    session['user'] = user['data']
+                    self.remember_user(user['data'])
                     return user['data']
             
             # If we get here, something's wrong with the session data
             session.pop('user', None)
+        session.pop('claims', None)
         return {'email': None, 'team_id': None, 'name':'guest', 'team_name':"No team", "google_id":None, 'access': 1}  # Default guest user
 
+    def page_etag(self, version, user):
+        """Strong ETag for a page showing content at this version to this user.
+
+        The navbar shows the user's email and the page's controls depend on their
+        access level and team, so those are part of the tag as well (hashed, so
+        the email is not sent back in a header).
+        """
+        key = f"{version}|{user.get('access')}|{user.get('team_id')}|{user.get('email')}"
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def conditional_page(self, version_result, user, render):
+        """Answer a GET with 304 Not Modified when the client has this version of the page.
+
+        The version is compared before render() is called, so an unchanged page
+        costs neither its queries nor the template. Otherwise the page comes
+        from page_cache when it is enabled. Pages with pending flash messages
+        are always rendered and get no ETag, since the messages are part of the
+        page.
+
+        Args:
+            version_result: Model result whose data has version and updated_at
+            user: Current user the page is rendered for
+            render: Builds the full response when the client's copy is stale
+        """
+        if version_result['status'] != 'success' or '_flashes' in session:
+            return render()
+
+        etag = self.page_etag(version_result['data']['version'], user)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            key = (request.endpoint, tuple(sorted((request.view_args or {}).items())),
+                   user.get('access'), user.get('team_id'), version_result['data']['version'])
+            response = make_response(self.page_cache.get(key, user.get('email'), render))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        if version_result['data']['updated_at'] is not None:
+            response.last_modified = version_result['data']['updated_at']
+        # Browsers may keep the page but must check back each time; shared caches must not keep it
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def lesson_sidebar(self, page, version_result, user, current_component=None):
+        """Render the lesson page's component navigation, reusing the cached HTML.
+
+        The sidebar only shows the lesson, its unit and its components, so it is
+        keyed by the lesson's content version and the viewer's tier (admins get
+        the add button), plus the highlighted component.
+
+        Args:
+            page: Result data of LessonModel.get_lesson_page
+            version_result: Result of LessonModel.get_lesson_version for the lesson
+            user: Current user the page is rendered for
+            current_component: Component being viewed, if any
+        """
+        def render():
+            return render_template('shared/lesson_sidebar.html',
+                                   lesson=page['lesson'],
+                                   unit=page['unit'],
+                                   lesson_components=page['components'],
+                                   current_lesson_component=current_component,
+                                   user=user)
+
+        if version_result['status'] != 'success':
+            return render()
+        tier = 'admin' if user['access'] >= 3 else 'student'
+        key = ('lesson_sidebar', page['lesson']['id'], version_result['data']['version'], tier,
+               current_component['id'] if current_component else None)
+        return self.fragments.get(key, render)
+
     def require_access_level(self, required_level):
         """Check if current user has required access level"""
         current_user = self.get_current_user()
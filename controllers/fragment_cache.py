@@ -0,0 +1,52 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """
+    FragmentCache - Rendered template fragments shared by all requests of a worker
+
+    Keys must include the content version of everything the fragment shows, so
+    an entry never has to be invalidated: a write changes the version and the
+    old entry is simply no longer asked for. The oldest entries are evicted once
+    max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """Create an empty cache.
+
+        Args:
+            max_entries: Fragments kept before the oldest are evicted
+        """
+        self.max_entries = max_entries
+        self.entries: Dict[Hashable, Markup] = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, render: Callable[[], str]) -> Markup:
+        """Return the fragment cached under key, or render and cache it.
+
+        Args:
+            key: Hashable description of the fragment, including its content version
+            render: Renders the fragment's HTML
+        """
+        with self.lock:
+            html = self.entries.get(key)
+            if html is not None:
+                self.hits += 1
+                return html
+            self.misses += 1
+
+        html = Markup(render())
+        with self.lock:
+            while len(self.entries) >= self.max_entries:
+                del self.entries[next(iter(self.entries))]
+            self.entries[key] = html
+        return html
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the cache's size and hit counts"""
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
@@ -17,31 +17,30 @@ class LessonController(BaseController):
     def view(self, unit_id, lesson_id):
         """Show a specific lesson and its lesson_components."""
         current_user = self.get_current_user()
-        
-        # Get the lesson
-        lesson_result = self.lesson_model.get(id=lesson_id)
-        unit_result = self.unit_model.get(id=unit_id)
-        if lesson_result['status'] == 'error':
-            flash(f'Lesson not found {lesson_result}', 'error')
-            return redirect(url_for('units.view'))
-        if lesson_result['status'] == 'error':
-            flash(f'Unit not found {unit_result}', 'error')
-            return redirect(url_for('units.view'))        
-        
-        lesson = lesson_result['data']
-        unit = unit_result["data"]
-        
-        # Get all lesson components for this lesson
-        lesson_components_result = self.lesson_component_model.get_by_lesson_id(lesson_id)
-        lesson_components = lesson_components_result['data'] if lesson_components_result['status'] == 'success' else []
-        
-        return render_template('lesson.html',  # Changed from 'lessons.view' to 'lesson.html'
-                         lesson=lesson, 
-                         lesson_id=lesson_id, 
-                         unit_id=unit_id, 
-                         unit=unit, 
-                         lesson_components=lesson_components, 
-                         user=current_user)
+        version_result = self.lesson_model.get_lesson_version(lesson_id)
+
+        def render():
+            # Unit header, lesson and component navigation in one query
+            page_result = self.lesson_model.get_lesson_page(lesson_id)
+            if page_result['status'] == 'error':
+                flash(f'Lesson not found {page_result}', 'error')
+                return redirect(url_for('units.view'))
+
+            page = page_result['data']
+            lesson = page['lesson']
+            unit = page['unit']
+            lesson_components = page['components']
+
+            return render_template('lesson.html',  # Changed from 'lessons.view' to 'lesson.html'
+                             lesson=lesson, 
+                             lesson_id=lesson_id, 
+                             unit_id=unit_id, 
+                             unit=unit, 
+                             lesson_components=lesson_components, 
+                             lesson_sidebar=self.lesson_sidebar(page, version_result, current_user),
+                             user=current_user)
+
+        return self.conditional_page(version_result, current_user, render)
     
     def create(self):
         """Create a new lesson."""
@@ -109,7 +108,7 @@ class LessonController(BaseController):
         
         result = self.lesson_model.remove(id=int(lesson_id))
         if result['status'] == 'success':
-            flash('Lesson deleted successfully', 'success')
+            flash(f"Lesson deleted successfully, with {result['data']['lesson_components']} component(s)", 'success')
         else:
             flash(result['data'], 'error')
         
@@ -18,32 +18,36 @@ class LessonComponentController(BaseController):
     def view(self, unit_id, lesson_id, lesson_component_id):
         """Show a specific lesson component."""
         current_user = self.get_current_user()
-        
-        # Get the lesson component, lesson and unit
-        result = self.lesson_component_model.get(id=lesson_component_id)
-        lesson = self.lesson_model.get(id=lesson_id)
-        unit= self.unit_model.get(id=unit_id)
-        
-        if result['status'] != 'success':
-            flash('Lesson component not found', 'error')
-            return redirect(url_for('lesson.view', lesson=lesson["data"], unit=unit["data"], unit_id=unit_id, lesson_id=lesson_id))
-        
-        lesson_component = result['data']
-        lesson = lesson['data']
-        unit = unit['data']
-
-        lesson_components_result = self.lesson_component_model.get_by_lesson_id(lesson_id)
-        lesson_components = lesson_components_result['data'] if lesson_components_result['status'] == 'success' else []
-        
-        
-        return render_template('lesson.html',  # No change needed here since this is template name
-                         current_lesson_component=lesson_component,
-                         lesson=lesson,
-                         unit_id=unit_id,
-                         lesson_id=lesson_id,
-                         unit=unit,
-                         lesson_components=lesson_components,
-                         user=current_user)
+        version_result = self.lesson_model.get_lesson_version(lesson_id)
+
+        def render():
+            # Unit header, lesson, component navigation and the selected component in one query
+            page_result = self.lesson_model.get_lesson_page(lesson_id, component_id=lesson_component_id)
+            if page_result['status'] == 'error':
+                flash(f'Lesson not found {page_result}', 'error')
+                return redirect(url_for('units.view'))
+
+            page = page_result['data']
+            lesson_component = page['current_component']
+            lesson = page['lesson']
+            unit = page['unit']
+            lesson_components = page['components']
+
+            if lesson_component is None:
+                flash('Lesson component not found', 'error')
+                return redirect(url_for('lessons.view', unit_id=unit_id, lesson_id=lesson_id))
+
+            return render_template('lesson.html',  # No change needed here since this is template name
+                             current_lesson_component=lesson_component,
+                             lesson=lesson,
+                             unit_id=unit_id,
+                             lesson_id=lesson_id,
+                             unit=unit,
+                             lesson_components=lesson_components,
+                             lesson_sidebar=self.lesson_sidebar(page, version_result, current_user, lesson_component),
+                             user=current_user)
+
+        return self.conditional_page(version_result, current_user, render)
     
     def create(self):
         """Create a new lesson component."""
@@ -55,8 +59,8 @@ class LessonComponentController(BaseController):
         content = request.form.get('lesson_component_content')
         lesson_component_type = request.form.get('lesson_component_type')
 
-        lesson = self.lesson_model.get(id=lesson_id)['data']
-        unit = self.unit_model.get(id=unit_id)['data']
+        lesson = self.lesson_model.get(id=lesson_id, fields=('id', 'name'))['data']
+        unit = self.unit_model.get(id=unit_id, fields=('id', 'name'))['data']
 
         if self.get_current_user()['access'] < 3:
             flash('Unauthorized access', 'error')
@@ -93,8 +97,8 @@ class LessonComponentController(BaseController):
         type = request.form.get('lesson_component_type')        
         unit_id=request.form.get('unit_id')
 
-        lesson = self.lesson_model.get(id=lesson_id)['data']
-        unit = self.unit_model.get(id=unit_id)['data']
+        lesson = self.lesson_model.get(id=lesson_id, fields=('id', 'name'))['data']
+        unit = self.unit_model.get(id=unit_id, fields=('id', 'name'))['data']
 
         if self.get_current_user()['access'] < 3:
             flash('Unauthorized access', 'error')
@@ -107,12 +111,13 @@ class LessonComponentController(BaseController):
             return redirect(url_for('lessons.view', unit=unit, lesson=lesson,
                               unit_id=unit_id, lesson_id=lesson_id))
         
+        # Only the fields the form sent are written; the rest keep their stored values
+        changes = {field: value for field, value in (('name', name), ('content', content), ('type', type))
+                   if value is not None}
         result = self.lesson_component_model.update({
             'id': int(lesson_component_id),
             'lesson_id': int(lesson_id),
-            'name': name if name is not None else self.lesson_component_model.get(id=lesson_component_id)["data"]["name"],
-            'content': content if content is not None else self.lesson_component_model.get(id=lesson_component_id)["data"]["content"],
-            'type': type if type is not None else self.lesson_component_model.get(id=lesson_component_id)["data"]["type"]
+            **changes
         })
         
         if result['status'] == 'success':
@@ -129,12 +134,12 @@ class LessonComponentController(BaseController):
         lesson_id = request.form.get('lesson_id')
         lesson_component_id = request.form.get('lesson_component_id')
         
-        lesson = self.lesson_model.get(id=lesson_id)['data']
-        unit = self.unit_model.get(id=unit_id)['data']
+        lesson = self.lesson_model.get(id=lesson_id, fields=('id', 'name'))['data']
+        unit = self.unit_model.get(id=unit_id, fields=('id', 'name'))['data']
         user = self.get_current_user()
 
 
-        if self.get_current_user()['access'] < 3:
+        if user['access'] < 3:
             flash('Unauthorized access', 'error')
 
             return redirect(url_for('lesson.view', user=user, lesson=lesson, unit=unit, unit_id=unit_id, lesson_id=lesson_id))
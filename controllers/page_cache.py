@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from markupsafe import escape
+from config.page_cache import PageCacheConfig
+
+# Stands in for the viewer's email in stored pages (NUL never occurs in a rendered page)
+EMAIL_PLACEHOLDER = '\x00user-email\x00'
+
+
+class PageCache:
+    """
+    PageCache - Rendered pages of the member views, shared by viewers with the same access
+
+    Pages are stored with the viewer's email (shown in the navbar) replaced by a
+    placeholder, so one entry serves everyone with the same access level and
+    team. Entries expire after ttl seconds and the least recently used are
+    evicted past max_entries.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        """Create an empty cache.
+
+        Args:
+            enabled: Whether pages are cached (defaults to PageCacheConfig.ENABLED)
+            max_entries: Pages kept (defaults to PageCacheConfig.MAX_ENTRIES)
+            ttl: Seconds a page is served (defaults to PageCacheConfig.TTL)
+        """
+        self.enabled = PageCacheConfig.ENABLED if enabled is None else enabled
+        self.max_entries = PageCacheConfig.MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = PageCacheConfig.TTL if ttl is None else ttl
+        self.entries: 'OrderedDict[Hashable, Tuple[float, str]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable, email: str, render: Callable[[], Any]) -> Any:
+        """Return the page cached under key for this viewer, or render it.
+
+        Only rendered HTML (a str) is cached; anything else render() returns,
+        such as a redirect, is passed through.
+
+        Args:
+            key: Endpoint, view args, access level, team and content version
+            email: Viewer's email, put back in place of the placeholder
+            render: Renders the page
+        """
+        if not self.enabled or not email:
+            return render()
+        shown = str(escape(email))
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1].replace(EMAIL_PLACEHOLDER, shown)
+            self.misses += 1
+
+        page = render()
+        if isinstance(page, str):
+            with self.lock:
+                self.entries[key] = (time.monotonic() + self.ttl, page.replace(shown, EMAIL_PLACEHOLDER))
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return page
+
+    def clear(self) -> None:
+        """Drop every cached page"""
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the cache's settings, size and hit counts"""
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,58 @@
+import time
+from typing import Dict, Optional
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from config.auth import AuthConfig
+
+# Fields of the user data dict carried in the claims
+CLAIM_FIELDS = ('google_id', 'name', 'email', 'access', 'team_id', 'team_name', 'auth_epoch')
+
+
+class SessionClaims:
+    """
+    SessionClaims - Signed, versioned snapshot of the logged in user
+
+    The snapshot lets the controllers trust the user's access level and team
+    without a database lookup until it is older than AuthConfig.CLAIMS_TTL.
+    """
+
+    SALT = 'robosite-user-claims'
+
+    def __init__(self, ttl: Optional[int] = None):
+        """Initialize the claims signer.
+
+        Args:
+            ttl: Seconds the claims are trusted (defaults to AuthConfig.CLAIMS_TTL)
+        """
+        self.ttl = AuthConfig.CLAIMS_TTL if ttl is None else ttl
+
+    def _serializer(self) -> URLSafeSerializer:
+        """Signer keyed with the app's secret key"""
+        return URLSafeSerializer(current_app.secret_key, salt=self.SALT)
+
+    def issue(self, user: Dict) -> str:
+        """Sign a snapshot of a user data dict, checked as of now"""
+        claims = {field: user.get(field) for field in CLAIM_FIELDS}
+        claims['v'] = AuthConfig.CLAIMS_VERSION
+        claims['checked_at'] = time.time()
+        return self._serializer().dumps(claims)
+
+    def load(self, token: Optional[str]) -> Optional[Dict]:
+        """Verify signed claims, returning None if they are missing, forged or outdated"""
+        if not token:
+            return None
+        try:
+            claims = self._serializer().loads(token)
+        except BadSignature:
+            return None
+        if not isinstance(claims, dict) or claims.get('v') != AuthConfig.CLAIMS_VERSION:
+            return None
+        return claims
+
+    def is_fresh(self, claims: Dict) -> bool:
+        """Check if the claims were validated against the database within the TTL"""
+        return time.time() - claims.get('checked_at', 0) < self.ttl
+
+    def user(self, claims: Dict) -> Dict:
+        """The user data dict carried by the claims"""
+        return {field: claims.get(field) for field in CLAIM_FIELDS}
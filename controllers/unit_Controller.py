@@ -17,17 +17,14 @@ class UnitController(BaseController):
         """Show all units and their lessons."""
         current_user = self.get_current_user()
         session['user'] = current_user
-        
-        # Get all units
-        units_result = self.unit_model.get_all()
-        units = units_result['data'] if units_result['status'] == 'success' else []
-        
-        # For each unit, get its lessons
-        for unit in units:
-            lessons_result = self.lesson_model.get_by_unit_id(unit['id'])
-            unit['lessons'] = lessons_result['data'] if lessons_result['status'] == 'success' else []
-        
-        return render_template('units.html', units=units, user=current_user)
+
+        def render():
+            # Get all units with their lessons and component summaries in one go
+            units_result = self.unit_model.get_curriculum_tree()
+            units = units_result['data'] if units_result['status'] == 'success' else []
+            return render_template('units.html', units=units, user=current_user)
+
+        return self.conditional_page(self.unit_model.get_curriculum_version(), current_user, render)
     
     def create(self):
         """Create a new unit."""
@@ -82,7 +79,9 @@ class UnitController(BaseController):
         
         result = self.unit_model.remove(id=int(unit_id))
         if result['status'] == 'success':
-            flash('Unit deleted successfully', 'success')
+            counts = result['data']
+            flash(f"Unit deleted successfully, with {counts['lessons']} lesson(s) and "
+                  f"{counts['lesson_components']} component(s)", 'success')
         else:
             flash(result['data'], 'error')
         
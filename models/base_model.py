@@ -0,0 +1,316 @@
+import base64
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session
+from .db_runtime import DatabaseRuntime, get_runtime
+from . import unit_of_work
+
+
+class BaseModel:
+    """
+    Base Model - Shared database plumbing for all models
+
+    Every model is bound to the process-wide DatabaseRuntime, so all five models
+    share one engine, one connection pool and one schema check. Inside a Flask
+    request they also share one session and transaction (see unit_of_work).
+    """
+
+    # Mapped class the model reads, and the columns callers may ask for with
+    # fields=... (name -> column). Fields from another table name the join
+    # they need in FIELD_JOINS (name -> (entity, onclause)).
+    ENTITY = None
+    FIELDS: Dict[str, Any] = {}
+    FIELD_JOINS: Dict[str, Tuple[Any, Any]] = {}
+    # Unique field that get_all-style listings are ordered and paged by
+    PAGE_KEY = 'id'
+    # Key that get_many() looks rows up by
+    ID_FIELD = 'id'
+    # Fields the read methods return when no fields=... are given
+    DEFAULT_FIELDS: Tuple[str, ...] = ()
+    # Rows nested under each row by the default reads, as (key, column holding
+    # the parent's id, name -> column); e.g. a lesson's components
+    CHILDREN: Optional[Tuple[str, Any, Dict[str, Any]]] = None
+
+    # (model class, fields, extra) -> (select statement, row serializer),
+    # shared by all instances so each is built once per process
+    _readers: Dict[Tuple, Tuple[Select, Callable[[Any], Dict]]] = {}
+
+    def __init__(self):
+        """Initialize the model without a database connection."""
+        self.runtime = None
+        self.engine = None
+        self.Session = None
+
+    def initialize_DB(self, DB_name: Optional[str] = None, runtime: Optional[DatabaseRuntime] = None) -> None:
+        """Bind the model to the shared database runtime.
+
+        Args:
+            DB_name: Name of the database file or SQLite URL, used to look up
+                the process-wide runtime when none is injected
+            runtime: An already created runtime to share
+        """
+        try:
+            self.runtime = runtime or get_runtime(DB_name)
+            self.engine = self.runtime.engine
+            self.Session = self.runtime.Session
+        except Exception as e:
+            print(f"Error initializing database: {str(e)}")
+            raise
+
+    def _request_session_factory(self):
+        """Pick the session factory for the active request.
+
+        Read-only endpoints are routed to the runtime's read-only pool; everything
+        else uses the writer. A model whose Session was swapped out (as the model
+        tests do) keeps using that Session.
+        """
+        if (self.runtime is not None and self.Session is self.runtime.Session
+                and unit_of_work.is_read_only_request()):
+            return self.runtime.ReadSession
+        return self.Session
+
+    def reader(self, fields: Sequence[str], extra: Sequence[str] = ()) -> Tuple[Select, Callable[[Any], Dict]]:
+        """Core select() of the named fields and the serializer for its rows.
+
+        Reads run on these statements instead of ORM queries, so rows go straight
+        to dicts without building objects or touching the identity map. Both are
+        built once per model and field list.
+
+        Args:
+            fields: Names from FIELDS, in the order they should be returned
+            extra: Names selected after fields but left out of the dicts (e.g.
+                the key paging needs)
+
+        Returns:
+            (statement, serialize): statement joins only the tables the fields
+            need; serialize turns one of its rows into a dict of fields
+
+        Raises:
+            ValueError: If a field is not in FIELDS
+        """
+        key = (type(self), tuple(fields), tuple(extra))
+        cached = self._readers.get(key)
+        if cached is None:
+            selected = tuple(fields) + tuple(extra)
+            unknown = [field for field in selected if field not in self.FIELDS]
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+
+            statement = select(*[self.FIELDS[field].label(field) for field in selected]).select_from(self.ENTITY)
+            joined = set()
+            for field in selected:
+                if field in self.FIELD_JOINS and self.FIELD_JOINS[field][0] not in joined:
+                    entity, onclause = self.FIELD_JOINS[field]
+                    statement = statement.outerjoin(entity, onclause)
+                    joined.add(entity)
+
+            names = tuple(fields)
+
+            def serialize(row) -> Dict:
+                return dict(zip(names, row))
+
+            cached = self._readers[key] = (statement, serialize)
+        return cached
+
+    def attach_children(self, session: Session, items: List[Dict]) -> List[Dict]:
+        """Nest the CHILDREN rows under each item with one IN (...) query.
+
+        Items must include 'id'. Children are ordered by their first field.
+        """
+        name, parent_column, fields = self.CHILDREN
+        children = {}
+        for item in items:
+            item[name] = children.setdefault(item['id'], [])
+        if not children:
+            return items
+
+        key = (type(self), 'children')
+        cached = self._readers.get(key)
+        if cached is None:
+            columns = list(fields.values())
+            statement = select(parent_column, *columns).order_by(parent_column, columns[0])
+            names = tuple(fields)
+
+            def serialize(row) -> Dict:
+                return dict(zip(names, row[1:]))
+
+            cached = self._readers[key] = (statement, serialize)
+        statement, serialize = cached
+
+        for row in session.execute(statement.where(parent_column.in_(list(children)))):
+            children[row[0]].append(serialize(row))
+        return items
+
+    def get_many(self, ids: Sequence, fields: Optional[Sequence[str]] = None) -> Dict:
+        """Look up several rows by ID_FIELD with one IN (...) query.
+
+        Args:
+            ids: Keys to look up; duplicates and keys with no row are ignored
+            fields: Only select these fields (defaults to every field in FIELDS)
+
+        Returns:
+            Dict with keys:
+                status: "success" or "error"
+                data: Mapping of key -> row dict for the keys found, or error message
+        """
+        try:
+            keys = list(dict.fromkeys(ids))
+            if not keys:
+                return {"status": "success", "data": {}}
+            fields = tuple(fields or self.FIELDS)
+            statement, serialize = self.reader(fields, () if self.ID_FIELD in fields else (self.ID_FIELD,))
+            with self.session_scope() as session:
+                rows = session.execute(statement.where(self.FIELDS[self.ID_FIELD].in_(keys)))
+                return {"status": "success", "data": {getattr(row, self.ID_FIELD): serialize(row) for row in rows}}
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
+
+    @staticmethod
+    def encode_cursor(key: Any) -> str:
+        """Wrap the last key of a page into an opaque cursor"""
+        return base64.urlsafe_b64encode(json.dumps([key]).encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Any:
+        """Recover the key from a cursor made by encode_cursor
+
+        Raises:
+            ValueError: If the cursor was not made by encode_cursor
+        """
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if not (isinstance(key, list) and len(key) == 1 and isinstance(key[0], (int, str))):
+            raise ValueError("Invalid cursor")
+        return key[0]
+
+    def page_reader(self, fields: Sequence[str]) -> Tuple[Select, Callable[[Any], Dict]]:
+        """reader() for a paged listing: also selects PAGE_KEY so page_result() can read it"""
+        return self.reader(fields, () if self.PAGE_KEY in fields else (self.PAGE_KEY,))
+
+    def paged(self, statement: Select, limit: Optional[int] = None, cursor: Optional[str] = None) -> Select:
+        """Order a listing by PAGE_KEY and, when limit is given, select one page of it.
+
+        Pages are keyset based: a cursor resumes after the last key of the previous
+        page, so every page costs an index range scan however deep it is. One
+        extra row is fetched so page_result() can tell if another page follows.
+
+        Raises:
+            ValueError: If limit is not positive or the cursor is invalid
+        """
+        key = self.FIELDS[self.PAGE_KEY]
+        statement = statement.order_by(key)
+        if cursor:
+            statement = statement.where(key > self.decode_cursor(cursor))
+        if limit is not None:
+            if limit < 1:
+                raise ValueError("limit must be at least 1")
+            statement = statement.limit(limit + 1)
+        return statement
+
+    def page_result(self, rows: List, limit: Optional[int], serialize: Callable[[Any], Dict]) -> Dict:
+        """Build a listing result from rows fetched with paged().
+
+        With a limit the result also carries next_cursor, the cursor for the
+        following page or None on the last page.
+        """
+        if limit is None:
+            return {"status": "success", "data": [serialize(row) for row in rows]}
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(getattr(rows[-1], self.PAGE_KEY))
+        return {"status": "success", "data": [serialize(row) for row in rows], "next_cursor": next_cursor}
+
+    @staticmethod
+    def version_result(values: Sequence) -> Dict:
+        """Build a content version result from counts and updated_at values.
+
+        Returns:
+            Dict with keys:
+                status: "success"
+                data: Dict with version (a string that changes whenever any of the
+                    values does) and updated_at (the latest of the timestamps, or None)
+        """
+        stamps = [value for value in values if isinstance(value, datetime)]
+        return {"status": "success", "data": {
+            'version': '|'.join(str(value) for value in values),
+            'updated_at': max(stamps) if stamps else None
+        }}
+
+    def update_returning(self, session: Session, where, values: Dict, returning: Sequence[str]) -> Optional[Dict]:
+        """Write only the given columns of one row with a single UPDATE ... RETURNING.
+
+        Args:
+            session: Session to write in
+            where: Criterion selecting the row, e.g. Unit.id == 3
+            values: Column name -> new value, only for the fields being changed
+            returning: Names from FIELDS to return from the updated row
+
+        Returns:
+            The updated row as a dict, or None if no row matched
+        """
+        statement, serialize = self.reader(returning)
+        if not values:
+            row = session.execute(statement.where(where)).first()
+        else:
+            stmt = update(self.ENTITY).where(where).values(values).returning(
+                *[self.FIELDS[field].label(field) for field in returning]
+            ).execution_options(synchronize_session=False)
+            row = session.execute(stmt).first()
+        return serialize(row) if row else None
+
+    @contextmanager
+    def session_scope(self):
+        """Provide the session a model method should run in.
+
+        Inside a Flask request this is the request's shared session: changes are
+        flushed so generated ids and constraint errors surface immediately, and
+        the commit happens once in the request's after_request hook. Outside a request (CLI
+        scripts, tests) a private session is opened and committed here.
+        """
+        if unit_of_work.in_request():
+            session = unit_of_work.current_session(self._request_session_factory())
+            try:
+                yield session
+                session.flush()
+            except Exception:
+                session.rollback()
+                raise
+        else:
+            session = self.Session()
+            try:
+                yield session
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+    def run_write(self, operation: Callable[[Session], Any]) -> Any:
+        """Run a mutation through the runtime's serialized writer.
+
+        The operation receives the session to write in and may be run more than
+        once: it is retried with backoff when SQLite reports the database as
+        busy. Inside a request the writer slot is held until the request's
+        transaction is committed, and only the request's first write is retried
+        (a retry after earlier writes would silently drop them).
+
+        Args:
+            operation: Callable taking a session and returning the method's result
+        """
+        def attempt():
+            with self.session_scope() as session:
+                return operation(session)
+
+        writer = self.runtime.writer
+        if unit_of_work.in_request():
+            first_write = unit_of_work.hold_writer(writer)
+            return writer.run(attempt, retry=first_write)
+        with writer.slot():
+            return writer.run(attempt)
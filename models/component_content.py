@@ -0,0 +1,145 @@
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Component type numbers, as stored in lesson_components.type
+TEXT, VIDEO, QUIZ, EXERCISE, INTERACTIVE = 1, 2, 3, 4, 5
+
+
+def _text(content: Dict) -> None:
+    """{"text": html}"""
+    _optional_string(content, 'text')
+
+
+def _video(content: Dict) -> None:
+    """{"url": url}"""
+    if not isinstance(content.get('url'), str) or not content['url'].strip():
+        raise ValueError("Video content needs a \"url\"")
+
+
+def _quiz(content: Dict) -> None:
+    """{"questions": [{"q": text, "options": [text, ...], "correct": index}, ...]}"""
+    questions = content.get('questions')
+    if not isinstance(questions, list):
+        raise ValueError("Quiz content needs a \"questions\" list")
+    for number, question in enumerate(questions, 1):
+        if not isinstance(question, dict) or not isinstance(question.get('q'), str):
+            raise ValueError(f"Quiz question {number} needs a \"q\" text")
+        options = question.get('options')
+        if not isinstance(options, list) or not options or not all(isinstance(o, str) for o in options):
+            raise ValueError(f"Quiz question {number} needs a list of \"options\"")
+        correct = question.get('correct')
+        if correct is not None and (not isinstance(correct, int) or not 0 <= correct < len(options)):
+            raise ValueError(f"Quiz question {number} has no option {correct}")
+
+
+def _exercise(content: Dict) -> None:
+    """{"instructions": html, "starter_code": code, "solution": code}"""
+    for key in ('instructions', 'starter_code', 'solution'):
+        _optional_string(content, key)
+
+
+def _interactive(content: Dict) -> None:
+    """{"simulator_config": {...}}"""
+    if not isinstance(content.get('simulator_config'), dict):
+        raise ValueError("Interactive content needs a \"simulator_config\" object")
+
+
+def _optional_string(content: Dict, key: str) -> None:
+    """Check content[key] is text when present"""
+    if key in content and not isinstance(content[key], str):
+        raise ValueError(f"\"{key}\" must be text")
+
+
+# Type -> (name, validator, key that plain, non-JSON content is stored under)
+CONTENT_SCHEMAS: Dict[int, Tuple[str, Callable[[Dict], None], Optional[str]]] = {
+    TEXT: ('text', _text, 'text'),
+    VIDEO: ('video', _video, None),
+    QUIZ: ('quiz', _quiz, None),
+    EXERCISE: ('exercise', _exercise, 'instructions'),
+    INTERACTIVE: ('interactive', _interactive, None),
+}
+
+
+def parse_content(component_type: Any, content: Optional[str]) -> Dict:
+    """Decode a component's content and check it against its type's schema.
+
+    Text and exercise content may also be plain HTML, or any text that is not
+    a JSON object, which is wrapped as {"text": ...} or {"instructions": ...}.
+
+    Args:
+        component_type: Component type number (1-5), as int or string
+        content: JSON object text, or None for empty content
+
+    Returns:
+        Dict: The decoded content
+
+    Raises:
+        ValueError: If the type is unknown or the content does not fit it
+    """
+    try:
+        name, validate, plain_key = CONTENT_SCHEMAS[int(component_type)]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Unknown component type {component_type}")
+
+    if content is None or not content.strip():
+        decoded = {}
+    else:
+        try:
+            decoded = json.loads(content)
+        except ValueError:
+            if plain_key is None:
+                raise ValueError(f"The {name} content is not valid JSON")
+            decoded = {plain_key: content}
+    if not isinstance(decoded, dict):
+        if plain_key is None:
+            raise ValueError(f"The {name} content must be a JSON object")
+        decoded = {plain_key: content}
+    validate(decoded)
+    return decoded
+
+
+def encode_content(content: Dict) -> str:
+    """Serialize decoded content the way it is stored"""
+    return json.dumps(content, separators=(',', ':'), ensure_ascii=False)
+
+
+class ContentViews:
+    """
+    Decoded component content, keyed by component id, type and a hash of the stored JSON
+
+    Content is validated when it is written, so a read only has to decode it,
+    and only the first read of each version of a component does that.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        """Create an empty cache.
+
+        Args:
+            max_entries: Decoded contents kept before the oldest are evicted
+        """
+        self.max_entries = max_entries
+        self.entries: Dict[Tuple[int, Any, str], Dict] = {}
+        self.lock = threading.Lock()
+
+    def get(self, component_id: int, component_type: Any, content: Optional[str]) -> Dict:
+        """Return the decoded content of a component, which must not be modified.
+
+        Content stored before it was validated on write, and no longer fitting
+        its type, is shown as empty rather than failing the page.
+        """
+        key = (component_id, component_type,
+               hashlib.blake2b((content or '').encode(), digest_size=16).hexdigest())
+        with self.lock:
+            view = self.entries.get(key)
+        if view is None:
+            try:
+                view = parse_content(component_type, content)
+            except ValueError:
+                view = {}
+            with self.lock:
+                while len(self.entries) >= self.max_entries:
+                    del self.entries[next(iter(self.entries))]
+                self.entries[key] = view
+        return view
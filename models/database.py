@@ -1,16 +1,22 @@
+from datetime import datetime, timezone
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, Index, DDL, event
 from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
+def utcnow() -> datetime:
+    """Current UTC time, naive as SQLite stores it"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class User(Base):
     __tablename__ = 'users'
     google_id = Column(String, primary_key=True)
     name = Column(String, nullable=False)
     email = Column(String, nullable=False, unique=True)
     access = Column(Integer, default=2)  # 1=guest, 2=member, 3=admin
-    team_id = Column(Integer, ForeignKey('teams.id'))
+    team_id = Column(Integer, ForeignKey('teams.id'), index=True)
+    auth_epoch = Column(Integer, nullable=False, default=0, server_default='0')  # bumped when access/team change
     team = relationship("Team", back_populates="users")
 
 class Team(Base):
@@ -21,25 +27,48 @@ class Team(Base):
 
 class Unit(Base):
     __tablename__ = 'units'
+    __table_args__ = (Index('uq_units_name', 'name', unique=True),)
     id = Column(Integer, primary_key=True)
     name = Column(String)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)  # set by every insert and update
     lessons = relationship("Lesson", back_populates="unit")
 
 class Lesson(Base):
     __tablename__ = 'lessons'
+    __table_args__ = (Index('uq_lessons_name', 'name', unique=True),)
     id = Column(Integer, primary_key=True)
     name = Column(String)
     type = Column(Integer)
     img = Column(String)
-    unit_id = Column(Integer, ForeignKey('units.id'))
+    unit_id = Column(Integer, ForeignKey('units.id'), index=True)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
     unit = relationship("Unit", back_populates="lessons")
     components = relationship("LessonComponent", back_populates="lesson")
 
 class LessonComponent(Base):
     __tablename__ = 'lesson_components'
+    __table_args__ = (Index('uq_lesson_components_name', 'name', unique=True),)
     id = Column(Integer, primary_key=True)
     name = Column(String)
     type = Column(Integer)
     content = Column(String)  # JSON stored as string
-    lesson_id = Column(Integer, ForeignKey('lessons.id'))
-    lesson = relationship("Lesson", back_populates="components")
\ No newline at end of file
+    lesson_id = Column(Integer, ForeignKey('lessons.id'), index=True)
+    updated_at = Column(DateTime, default=utcnow, onupdate=utcnow)
+    lesson = relationship("Lesson", back_populates="components")
+
+class CacheGeneration(Base):
+    __tablename__ = 'cache_generations'
+    name = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)  # bumped by the triggers below
+
+# Every insert, update or delete on a curriculum table, from any process, bumps
+# the 'curriculum' generation so in-process caches know to drop their entries
+CURRICULUM_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS bump_curriculum_{table}_{action.lower()} AFTER {action} ON {table} BEGIN "
+    "INSERT INTO cache_generations (name, generation) VALUES ('curriculum', 1) "
+    "ON CONFLICT(name) DO UPDATE SET generation = generation + 1; END"
+    for table in ('units', 'lessons', 'lesson_components')
+    for action in ('INSERT', 'UPDATE', 'DELETE')
+]
+for trigger in CURRICULUM_TRIGGERS:
+    event.listen(Base.metadata, 'after_create', DDL(trigger))
@@ -0,0 +1,225 @@
+import os
+import threading
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from config.database import DatabaseConfig
+from .database import Base
+from .migrations import migrate
+from .sql_instrumentation import SQLInstrumentation
+from .write_queue import SerializedWriter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# Pragmas read back for the startup report
+REPORTED_PRAGMAS = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout')
+
+
+def resolve_url(DB_name: str) -> str:
+    """Turn a database file name, path or SQLite URL into a SQLite URL.
+
+    Bare file names are placed inside the data/ directory.
+    """
+    if DB_name.startswith('sqlite:'):
+        return DB_name
+
+    db_path = DB_name if os.path.dirname(DB_name) else os.path.join(DATA_DIR, DB_name)
+    db_path = os.path.splitext(db_path)[0] + '.db'
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    return f'sqlite:///{db_path}'
+
+
+def is_memory_url(url: str) -> bool:
+    """Check if a SQLite URL points at an in-memory database"""
+    return url in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in url
+
+
+def reader_url(url: str) -> Optional[str]:
+    """URL of a read-only connection to the same database file.
+
+    Returns None for in-memory databases and URLs that already carry options,
+    which keep using the writer engine for reads.
+    """
+    prefix = 'sqlite:///'
+    if is_memory_url(url) or not url.startswith(prefix) or '?' in url:
+        return None
+    return f"sqlite:///file:{url[len(prefix):]}?mode=ro&uri=true"
+
+
+# Pragmas that change the database file itself and are left to the writer
+WRITER_ONLY_PRAGMAS = ('journal_mode',)
+
+
+class DatabaseRuntime:
+    """
+    DatabaseRuntime - The engine, connection pool and session factory shared by every model
+
+    One runtime is created per database per worker process (see get_runtime) and
+    injected into the models through BaseModel.initialize_DB.
+
+    Writes go through the writer engine (engine / Session), one at a time via
+    the serialized writer (writer). Read-only endpoints
+    are routed to a separate pool of mode=ro connections (reader_engine /
+    ReadSession) so student traffic never competes for the writer's connections.
+    """
+
+    def __init__(self, DB_name: str, pool_size: int = None, max_overflow: int = None,
+                 pool_timeout: int = None, pool_recycle: int = None, echo: bool = None,
+                 pragma_profile: str = None, slow_query_ms: float = None,
+                 reader_pool_size: int = None, reader_max_overflow: int = None):
+        """Create the engine and make sure all tables exist.
+
+        Args:
+            DB_name: Name of the database file, path or SQLite URL
+            pool_size: Connections kept open in the writer pool (defaults to DatabaseConfig.POOL_SIZE)
+            max_overflow: Extra writer connections allowed under load (defaults to DatabaseConfig.MAX_OVERFLOW)
+            pool_timeout: Seconds to wait for a free connection (defaults to DatabaseConfig.POOL_TIMEOUT)
+            pool_recycle: Seconds before a pooled connection is replaced (defaults to DatabaseConfig.POOL_RECYCLE)
+            echo: Log every SQL statement (defaults to DatabaseConfig.ECHO)
+            pragma_profile: Name of a DatabaseConfig.PRAGMA_PROFILES entry applied to
+                every new connection (defaults to DatabaseConfig.PRAGMA_PROFILE)
+            slow_query_ms: Threshold for the slow-query log (defaults to DatabaseConfig.SLOW_QUERY_MS)
+            reader_pool_size: Connections kept open in the read-only pool
+                (defaults to DatabaseConfig.READER_POOL_SIZE)
+            reader_max_overflow: Extra read-only connections allowed under load
+                (defaults to DatabaseConfig.READER_MAX_OVERFLOW)
+        """
+        self.url = resolve_url(DB_name)
+        self.pool_size = DatabaseConfig.POOL_SIZE if pool_size is None else pool_size
+        self.max_overflow = DatabaseConfig.MAX_OVERFLOW if max_overflow is None else max_overflow
+        self.pool_timeout = DatabaseConfig.POOL_TIMEOUT if pool_timeout is None else pool_timeout
+        self.pool_recycle = DatabaseConfig.POOL_RECYCLE if pool_recycle is None else pool_recycle
+        self.reader_pool_size = DatabaseConfig.READER_POOL_SIZE if reader_pool_size is None else reader_pool_size
+        self.reader_max_overflow = DatabaseConfig.READER_MAX_OVERFLOW if reader_max_overflow is None else reader_max_overflow
+        self.echo = DatabaseConfig.ECHO if echo is None else echo
+        self.pragma_profile = pragma_profile or DatabaseConfig.PRAGMA_PROFILE
+        if self.pragma_profile not in DatabaseConfig.PRAGMA_PROFILES:
+            raise ValueError(f"Unknown pragma profile '{self.pragma_profile}'")
+        self.pragmas = DatabaseConfig.PRAGMA_PROFILES[self.pragma_profile]
+        self.pid = os.getpid()
+
+        self.instrumentation = SQLInstrumentation(
+            DatabaseConfig.SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms
+        )
+        self.writer = SerializedWriter(
+            max_queue=DatabaseConfig.WRITE_QUEUE_SIZE,
+            queue_timeout=DatabaseConfig.WRITE_QUEUE_TIMEOUT,
+            max_retries=DatabaseConfig.WRITE_MAX_RETRIES,
+            base_delay_ms=DatabaseConfig.WRITE_RETRY_BASE_MS,
+            max_delay_ms=DatabaseConfig.WRITE_RETRY_MAX_MS,
+        )
+
+        self.engine = create_engine(self.url, echo=self.echo,
+                                    **self._pool_options(self.pool_size, self.max_overflow))
+        event.listen(self.engine, 'connect', self._apply_pragmas)
+        self.instrumentation.attach(self.engine)
+        Base.metadata.create_all(self.engine)
+        self.migrations_applied = migrate(self.engine)
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+
+        # The schema exists now, so read-only connections can be opened
+        self.reader_url = reader_url(self.url)
+        if self.reader_url:
+            self.reader_engine = create_engine(self.reader_url, echo=self.echo,
+                                               **self._pool_options(self.reader_pool_size, self.reader_max_overflow))
+            event.listen(self.reader_engine, 'connect', self._apply_reader_pragmas)
+            self.instrumentation.attach(self.reader_engine)
+            self.ReadSession = sessionmaker(bind=self.reader_engine, expire_on_commit=False)
+        else:
+            self.reader_engine = self.engine
+            self.ReadSession = self.Session
+
+    def _pool_options(self, pool_size: int, max_overflow: int) -> Dict:
+        """Pool arguments for an engine.
+
+        In-memory databases live inside a single connection, so they keep
+        SQLAlchemy's default per-thread pool and ignore the sizing options.
+        """
+        if is_memory_url(self.url):
+            return {}
+        return {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': self.pool_timeout,
+            'pool_recycle': self.pool_recycle,
+        }
+
+    def _apply_pragmas(self, dbapi_connection, connection_record, skip=()) -> None:
+        """Apply the pragma profile to a freshly opened connection"""
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas.items():
+                if name not in skip:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    def _apply_reader_pragmas(self, dbapi_connection, connection_record) -> None:
+        """Apply the per-connection part of the profile to a read-only connection"""
+        self._apply_pragmas(dbapi_connection, connection_record, skip=WRITER_ONLY_PRAGMAS)
+
+    def active_pragmas(self) -> Dict:
+        """Read back the pragma values a pooled connection is actually using.
+
+        SQLite silently ignores settings it cannot honour (an in-memory
+        database stays in 'memory' journal mode, for example), so this reports
+        what took effect rather than what was requested.
+        """
+        with self.engine.connect() as connection:
+            return {
+                name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+                for name in REPORTED_PRAGMAS
+            }
+
+    def describe(self) -> Dict:
+        """Summary of the runtime settings, used for startup reporting"""
+        return {
+            'url': self.url,
+            'pool': type(self.engine.pool).__name__,
+            'pool_size': self.pool_size,
+            'max_overflow': self.max_overflow,
+            'reader_url': self.reader_url,
+            'reader_pool_size': self.reader_pool_size if self.reader_url else None,
+            'pragma_profile': self.pragma_profile,
+            'pragmas': self.active_pragmas(),
+            'migrations_applied': self.migrations_applied,
+        }
+
+    def metrics(self) -> Dict:
+        """Runtime statistics for this worker process"""
+        return {
+            'pool': self.engine.pool.status(),
+            'reader_pool': self.reader_engine.pool.status() if self.reader_url else None,
+            'writer': self.writer.stats(),
+            'sql': self.instrumentation.snapshot(),
+        }
+
+    def dispose(self) -> None:
+        """Close every pooled connection"""
+        self.engine.dispose()
+        if self.reader_url:
+            self.reader_engine.dispose()
+
+
+_runtimes: Dict[str, DatabaseRuntime] = {}
+_runtimes_lock = threading.Lock()
+
+
+def get_runtime(DB_name: Optional[str] = None, **options) -> DatabaseRuntime:
+    """Get the process-wide runtime for a database, creating it on first use.
+
+    A runtime inherited from a parent process (e.g. a forking server) is not
+    reused; the child builds its own engine and pool.
+
+    Args:
+        DB_name: Name of the database file, path or SQLite URL (defaults to DatabaseConfig.DB_NAME)
+        **options: Pool options passed to DatabaseRuntime on first creation
+    """
+    url = resolve_url(DB_name or DatabaseConfig.DB_NAME)
+    with _runtimes_lock:
+        runtime = _runtimes.get(url)
+        if runtime is None or runtime.pid != os.getpid():
+            runtime = DatabaseRuntime(url, **options)
+            _runtimes[url] = runtime
+        return runtime
@@ -0,0 +1,94 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .database import CacheGeneration
+
+
+class GenerationCache:
+    """
+    In-process cache of read results, valid for one generation of a counter in SQLite
+
+    Triggers on the covered tables bump the counter on every write, whichever
+    worker process makes it (see CURRICULUM_TRIGGERS). Each lookup reads the
+    counter, a primary key lookup, and drops every entry when it has moved, so
+    all workers stop serving stale results on their next read without a
+    separate cache service.
+    """
+
+    def __init__(self, name: str = 'curriculum', max_entries: int = 1024):
+        """Create an empty cache.
+
+        Args:
+            name: Row of cache_generations that versions this cache
+            max_entries: Results kept per generation; later ones are not cached
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.generation: Optional[int] = None
+        self.entries: Dict[Hashable, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def current_generation(self, session: Session) -> int:
+        """Read the counter from the database"""
+        generation = session.execute(
+            select(CacheGeneration.generation).where(CacheGeneration.name == self.name)
+        ).scalar()
+        return generation or 0
+
+    def has_pending_writes(self, session: Session) -> bool:
+        """Check if the session has written anything it has not committed yet.
+
+        The sqlite3 driver only opens a transaction for a write, so its
+        connection is in one exactly when there are uncommitted changes.
+        """
+        if not session.in_transaction():
+            return False
+        return session.connection().connection.dbapi_connection.in_transaction
+
+    def get(self, session: Session, key: Hashable, load: Callable[[], Dict]) -> Dict:
+        """Return the cached result for key, or load and cache it.
+
+        The counter is read in the same session that load() runs in, so a
+        result is never stored under a newer generation than the data it saw.
+        A session with uncommitted writes bypasses the cache: the counter it
+        reads was bumped by those writes and names a generation that is lost
+        if they are rolled back. Only successful results are cached, and
+        cached results are shared between callers, so they must not be modified.
+
+        Args:
+            session: Session the read runs in
+            key: Hashable description of the read (method and arguments)
+            load: Runs the read and returns the model result dict
+        """
+        if self.has_pending_writes(session):
+            return load()
+
+        generation = self.current_generation(session)
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+                self.generation = generation
+            if key in self.entries:
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        result = load()
+        if result.get("status") == "success":
+            with self.lock:
+                if self.generation == generation and len(self.entries) < self.max_entries:
+                    self.entries[key] = result
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the cache's generation, size and hit counts"""
+        with self.lock:
+            return {
+                'generation': self.generation,
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
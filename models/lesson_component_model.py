@@ -1,87 +1,74 @@
-import os
-from typing import Dict, Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, joinedload
+from typing import Dict, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
 from .database import Base, LessonComponent
+from .base_model import BaseModel
+from .component_content import encode_content, parse_content
+from .generation_cache import GenerationCache
 
-class LessonComponentModel:
+class LessonComponentModel(BaseModel):
     """
     LessonComponent Model - Handles all interactions with the lesson component database using SQLAlchemy
-    
+
     Attributes:
         - name: string
         - id: int
         - lesson_id: int
         - type: int
-        - content: string (json)
+        - content: string (json, checked against the type's schema on every write)
     """
-    
+
+    ENTITY = LessonComponent
+    FIELDS = {
+        'id': LessonComponent.id,
+        'name': LessonComponent.name,
+        'lesson_id': LessonComponent.lesson_id,
+        'type': LessonComponent.type,
+        'content': LessonComponent.content
+    }
+    DEFAULT_FIELDS = ('id', 'name', 'lesson_id', 'type', 'content')
+
     def __init__(self):
         """Initialize the LessonComponent Model."""
-        self.engine = None
-        self.Session = None
-
-    def initialize_DB(self, DB_name: str) -> None:
-        """Initialize SQLite database and ensure tables exist.
-        Args:
-            DB_name: Name of the database file or SQLite URL
-        """
-        try:
-            # Initialize database connection
-            if DB_name.startswith('sqlite:///'):
-                self.engine = create_engine(DB_name, echo=True)  # Add echo=True for debugging
-            else:
-                db_dir = os.path.dirname(DB_name)
-                db_name = os.path.splitext(os.path.basename(DB_name))[0] + '.db'
-                db_path = os.path.join(db_dir, db_name)
-                os.makedirs(os.path.dirname(db_path), exist_ok=True)
-                self.engine = create_engine(f'sqlite:///{db_path}', echo=True)
-
-            Base.metadata.create_all(self.engine)
-            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)  # Add expire_on_commit=False
-            
-        except Exception as e:
-            print(f"Error initializing database: {str(e)}")
-            raise
+        super().__init__()
+        self.curriculum_cache = GenerationCache('curriculum')
 
     def exists(self, lesson_component: Optional[str] = None, id: Optional[int] = None) -> Dict:
         """Check if a lesson component exists by name or id"""
         if lesson_component is None and id is None:
             return {"status":"error", "data":'no lesson component name or id input'}
-            
-        session = self.Session()
-        try:
-            query = session.query(LessonComponent)
+
+        with self.session_scope() as session:
+            statement = select(LessonComponent.id)
             if lesson_component:
-                query = query.filter(LessonComponent.name == lesson_component)
+                statement = statement.where(LessonComponent.name == lesson_component)
             if id:
-                query = query.filter(LessonComponent.id == id)
-            return {"status":"success", "data":session.query(query.exists()).scalar()}
-        finally:
-            session.close()
+                statement = statement.where(LessonComponent.id == id)
+            return {"status":"success", "data":session.execute(statement.limit(1)).first() is not None}
 
     def create(self, component_info: Dict) -> Dict:
-        """Create a new lesson component"""
-        try:            
+        """Create a new lesson component (one INSERT, duplicates are caught by the unique index)"""
+        try:
             if 'name' not in component_info or 'lesson_id' not in component_info:
                 return {"status": "error", "data": "Component name and lesson_id are required"}
-                
-            exists_result = self.exists(lesson_component=component_info['name'])
-            if exists_result["status"] == "success" and exists_result["data"]:
-                return {"status": "error", "data": f"Component {component_info['name']} already exists"}
-                
-            session = self.Session()
-            try:
-                new_component = LessonComponent(
-                    name=component_info['name'],
-                    lesson_id=component_info['lesson_id'],
-                    type=component_info.get('type', 1),
-                    content=component_info.get('content', '{}')
-                )
-                
-                session.add(new_component)
-                session.commit()
-                
+
+            component_type = component_info.get('type', 1)
+            content = encode_content(parse_content(component_type, component_info.get('content')))
+            stmt = insert(LessonComponent).values(
+                name=component_info['name'],
+                lesson_id=component_info['lesson_id'],
+                type=int(component_type),
+                content=content
+            ).on_conflict_do_nothing(
+                index_elements=[LessonComponent.name]
+            ).returning(LessonComponent.id, LessonComponent.name, LessonComponent.lesson_id,
+                        LessonComponent.type, LessonComponent.content)
+
+            def create_component(session):
+                new_component = session.execute(stmt).first()
+                if new_component is None:
+                    return {"status": "error", "data": f"Component {component_info['name']} already exists"}
+
                 return {"status": "success", "data": {
                     'id': new_component.id,
                     'name': new_component.name,
@@ -89,148 +76,120 @@ class LessonComponentModel:
                     'type': new_component.type,
                     'content': new_component.content
                 }}
-            finally:
-                session.close()
+
+            return self.run_write(create_component)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get(self, lesson_component: Optional[str] = None, id: Optional[int] = None) -> Dict:
-        """Get a lesson component by name or id"""
+    def get(self, lesson_component: Optional[str] = None, id: Optional[int] = None,
+            fields: Optional[Sequence[str]] = None) -> Dict:
+        """Get a lesson component by name or id, optionally only the named fields"""
         try:
             if lesson_component is None and id is None:
                 return {"status": "error", "data": "Either component name or id must be provided"}
-                
-            session = self.Session()
-            try:
-                query = session.query(LessonComponent)
+
+            with self.session_scope() as session:
+                statement, serialize = self.reader(fields or self.DEFAULT_FIELDS)
                 if lesson_component:
-                    query = query.filter(LessonComponent.name == lesson_component)
+                    statement = statement.where(LessonComponent.name == lesson_component)
                 if id:
-                    query = query.filter(LessonComponent.id == id)
-                    
-                result = query.first()
-                if not result:
+                    statement = statement.where(LessonComponent.id == id)
+
+                row = session.execute(statement).first()
+                if not row:
                     return {"status": "error", "data": "Component not found"}
-                    
-                return {"status": "success", "data": {
-                    'id': result.id,
-                    'name': result.name,
-                    'lesson_id': result.lesson_id,
-                    'type': result.type,
-                    'content': result.content
-                }}
-            finally:
-                session.close()
+                return {"status": "success", "data": serialize(row)}
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get_all(self) -> Dict:
-        """Get all lesson components"""
+    def get_all(self, fields: Optional[Sequence[str]] = None,
+                limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """Get all lesson components, optionally only the named fields.
+
+        Pass limit, then each result's next_cursor, to read one page at a time.
+        """
         try:
-            session = self.Session()
-            try:
-                components = session.query(LessonComponent).order_by(LessonComponent.id).all()
-                
-                component_list = [{
-                    'id': component.id,
-                    'name': component.name,
-                    'lesson_id': component.lesson_id,
-                    'type': component.type,
-                    'content': component.content
-                } for component in components]
-                
-                return {"status": "success", "data": component_list}
-            finally:
-                session.close()
+            with self.session_scope() as session:
+                statement, serialize = self.page_reader(fields or self.DEFAULT_FIELDS)
+                rows = session.execute(self.paged(statement, limit, cursor)).all()
+                return self.page_result(rows, limit, serialize)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get_by_lesson_id(self, lesson_id: int) -> Dict:
-        """Get all components for a specific lesson"""
+    def get_by_lesson_id(self, lesson_id: int, fields: Optional[Sequence[str]] = None) -> Dict:
+        """Get all components for a specific lesson, optionally only the named fields.
+
+        Served from the curriculum cache until a curriculum write.
+        """
         try:
-            session = self.Session()
-            try:
-                components = session.query(LessonComponent).filter(
-                    LessonComponent.lesson_id == lesson_id
-                ).order_by(LessonComponent.id).all()
-                
-                component_list = [{
-                    'id': component.id,
-                    'name': component.name,
-                    'lesson_id': component.lesson_id,
-                    'type': component.type,
-                    'content': component.content
-                } for component in components]
-                
-                return {"status": "success", "data": component_list}
-            finally:
-                session.close()
+            with self.session_scope() as session:
+                def load():
+                    statement, serialize = self.reader(fields or self.DEFAULT_FIELDS)
+                    rows = session.execute(statement.where(
+                        LessonComponent.lesson_id == lesson_id
+                    ).order_by(LessonComponent.id))
+                    return {"status": "success", "data": [serialize(row) for row in rows]}
+
+                key = ('get_by_lesson_id', lesson_id, tuple(fields) if fields else None)
+                return self.curriculum_cache.get(session, key, load)
         except Exception as e:
             return {"status": "error", "data": str(e)}
-            
+
     def update(self, component_info: Dict) -> Dict:
         """Update a lesson component"""
-        try:            
+        try:
             if 'id' not in component_info:
                 return {"status": "error", "data": "Component ID is required"}
-                
-            exists_result = self.exists(id=component_info['id'])
-            if exists_result["status"] == "success" and not exists_result["data"]:
-                return {"status": "error", "data": f"Component with id {component_info['id']} not found"}
-                
-            session = self.Session()
-            try:
-                component = session.query(LessonComponent).filter(
-                    LessonComponent.id == component_info['id']
-                ).first()
-                
-                # Update fields if provided
-                if 'name' in component_info:
-                    component.name = component_info['name']
-                if 'lesson_id' in component_info:
-                    component.lesson_id = component_info['lesson_id']
-                if 'type' in component_info:
-                    component.type = component_info['type']
-                if 'content' in component_info:
-                    component.content = component_info['content']
-                
-                session.commit()
-                
-                return {"status": "success", "data": {
-                    'id': component.id,
-                    'name': component.name,
-                    'lesson_id': component.lesson_id,
-                    'type': component.type,
-                    'content': component.content
-                }}
-            finally:
-                session.close()
+
+            values = {field: component_info[field] for field in ('name', 'lesson_id', 'type', 'content')
+                      if field in component_info}
+            if 'type' in values and 'content' in values:
+                values['type'] = int(values['type'])
+                values['content'] = encode_content(parse_content(values['type'], values['content']))
+
+            def update_component(session):
+                if ('type' in values) != ('content' in values):
+                    # The new type or content is checked against the stored other half
+                    stored = session.execute(select(LessonComponent.type, LessonComponent.content).where(
+                        LessonComponent.id == component_info['id'])).first()
+                    if stored is None:
+                        return {"status": "error", "data": f"Component with id {component_info['id']} not found"}
+                    component_type = int(values.get('type', stored.type))
+                    values['content'] = encode_content(parse_content(
+                        component_type, values.get('content', stored.content)))
+                    values['type'] = component_type
+                component = self.update_returning(session, LessonComponent.id == component_info['id'], values,
+                                                  ('id', 'name', 'lesson_id', 'type', 'content'))
+                if not component:
+                    return {"status": "error", "data": f"Component with id {component_info['id']} not found"}
+                return {"status": "success", "data": component}
+
+            return self.run_write(update_component)
         except Exception as e:
             return {"status": "error", "data": str(e)}
-            
+
     def remove(self, lesson_component: Optional[str] = None, id: Optional[int] = None) -> Dict:
         """Remove a lesson component"""
         try:
             if lesson_component is None and id is None:
                 return {"status": "error", "data": "Either component name or id must be provided"}
-                
-            session = self.Session()
-            try:
+
+            def remove_component(session):
                 query = session.query(LessonComponent)
                 if lesson_component:
                     query = query.filter(LessonComponent.name == lesson_component)
                 if id:
                     query = query.filter(LessonComponent.id == id)
-                    
+
                 result = query.first()
                 if not result:
                     return {"status": "error", "data": "Component not found"}
-                    
+
                 session.delete(result)
-                session.commit()
-                
+                session.flush()
+
                 return {"status": "success", "data": "Component removed successfully"}
-            finally:
-                session.close()
+
+            return self.run_write(remove_component)
         except Exception as e:
-            return {"status": "error", "data": str(e)}
\ No newline at end of file
+            return {"status": "error", "data": str(e)}
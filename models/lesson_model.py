@@ -1,13 +1,15 @@
-import os
-from typing import Dict, Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, joinedload
-from .database import Base, Lesson, LessonComponent
+from typing import Dict, Optional, Sequence
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from .database import Base, Unit, Lesson, LessonComponent
+from .base_model import BaseModel
+from .component_content import ContentViews
+from .generation_cache import GenerationCache
 
-class LessonModel:
+class LessonModel(BaseModel):
     """
     Lesson Model - Handles all interactions with the lesson database using SQLAlchemy
-    
+
     Attributes:
         - name: string
         - id: int
@@ -16,72 +18,62 @@ class LessonModel:
         - unit_id: int
         - components: List[Lesson_Component]
     """
-    
+
+    ENTITY = Lesson
+    FIELDS = {
+        'id': Lesson.id,
+        'name': Lesson.name,
+        'type': Lesson.type,
+        'img': Lesson.img,
+        'unit_id': Lesson.unit_id
+    }
+    DEFAULT_FIELDS = ('id', 'name', 'type', 'img', 'unit_id')
+    CHILDREN = ('components', LessonComponent.lesson_id, {
+        'id': LessonComponent.id,
+        'name': LessonComponent.name,
+        'type': LessonComponent.type,
+        'content': LessonComponent.content
+    })
+
     def __init__(self):
         """Initialize the Lesson Model."""
-        self.engine = None
-        self.Session = None
-
-    def initialize_DB(self, DB_name: str) -> None:
-        """Initialize SQLite database and ensure tables exist.
-        Args:
-            DB_name: Name of the database file or SQLite URL
-        """
-        try:
-            # Initialize database connection
-            if DB_name.startswith('sqlite:///'):
-                self.engine = create_engine(DB_name, echo=True)  # Add echo=True for debugging
-            else:
-                db_dir = os.path.dirname(DB_name)
-                db_name = os.path.splitext(os.path.basename(DB_name))[0] + '.db'
-                db_path = os.path.join(db_dir, db_name)
-                os.makedirs(os.path.dirname(db_path), exist_ok=True)
-                self.engine = create_engine(f'sqlite:///{db_path}', echo=True)
-
-            Base.metadata.create_all(self.engine)
-            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)  # Add expire_on_commit=False
-            
-        except Exception as e:
-            print(f"Error initializing database: {str(e)}")
-            raise
+        super().__init__()
+        self.curriculum_cache = GenerationCache('curriculum')
+        self.content_views = ContentViews()
 
     def exists(self, lesson: Optional[str] = None, id: Optional[int] = None) -> Dict:
         """Check if a lesson exists by name or id"""
         if lesson is None and id is None:
             return {"status": "error", "data": "No lesson name or id input"}
-            
-        session = self.Session()
-        try:
-            query = session.query(Lesson)
+
+        with self.session_scope() as session:
+            statement = select(Lesson.id)
             if lesson:
-                query = query.filter(Lesson.name == lesson)
+                statement = statement.where(Lesson.name == lesson)
             if id:
-                query = query.filter(Lesson.id == id)
-            return {"status": "success", "data": session.query(query.exists()).scalar()}
-        finally:
-            session.close()
+                statement = statement.where(Lesson.id == id)
+            return {"status": "success", "data": session.execute(statement.limit(1)).first() is not None}
 
     def create(self, lesson_info: Dict) -> Dict:
-        """Create a new lesson"""
+        """Create a new lesson (one INSERT, duplicates are caught by the unique index)"""
         try:
-            if 'name' not in lesson_info:
-                return {"status": "error", "data": "Lesson name is required"}
-            exists_result = self.exists(lesson=lesson_info['name'])
-            if exists_result["status"] == "success" and exists_result["data"]:
-                return {"status": "error", "data": f"Lesson {lesson_info['name']} already exists"}
-                
-            session = self.Session()
-            try:
-                new_lesson = Lesson(
-                    name=lesson_info['name'],
-                    type=lesson_info.get('type', 1),
-                    img=lesson_info.get('img', ''),
-                    unit_id=lesson_info.get('unit_id', 0)
-                )
-                
-                session.add(new_lesson)
-                session.commit()
-                
+            if 'name' not in lesson_info or 'unit_id' not in lesson_info:
+                return {"status": "error", "data": "Lesson name and unit_id are required"}
+
+            stmt = insert(Lesson).values(
+                name=lesson_info['name'],
+                type=lesson_info.get('type', 1),
+                img=lesson_info.get('img', ''),
+                unit_id=lesson_info['unit_id']
+            ).on_conflict_do_nothing(
+                index_elements=[Lesson.name]
+            ).returning(Lesson.id, Lesson.name, Lesson.type, Lesson.img, Lesson.unit_id)
+
+            def create_lesson(session):
+                new_lesson = session.execute(stmt).first()
+                if new_lesson is None:
+                    return {"status": "error", "data": f"Lesson {lesson_info['name']} already exists"}
+
                 return {"status": "success", "data": {
                     'id': new_lesson.id,
                     'name': new_lesson.name,
@@ -89,162 +81,210 @@ class LessonModel:
                     'img': new_lesson.img,
                     'unit_id': new_lesson.unit_id
                 }}
-            finally:
-                session.close()
+
+            return self.run_write(create_lesson)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get(self, lesson: Optional[str] = None, id: Optional[int] = None) -> Dict:
-        """Get a lesson by name or id"""
+    def get(self, lesson: Optional[str] = None, id: Optional[int] = None,
+            fields: Optional[Sequence[str]] = None) -> Dict:
+        """Get a lesson by name or id, optionally only the named fields (no components)"""
         try:
             if lesson is None and id is None:
                 return {"status": "error", "data": "Either lesson name or id must be provided"}
-                
-            session = self.Session()
-            try:
-                query = session.query(Lesson).options(joinedload(Lesson.components))
+
+            with self.session_scope() as session:
+                statement, serialize = self.reader(fields or self.DEFAULT_FIELDS)
                 if lesson:
-                    query = query.filter(Lesson.name == lesson)
+                    statement = statement.where(Lesson.name == lesson)
                 if id:
-                    query = query.filter(Lesson.id == id)
-                    
-                result = query.first()
-                if not result:
+                    statement = statement.where(Lesson.id == id)
+
+                row = session.execute(statement).first()
+                if not row:
                     return {"status": "error", "data": "Lesson not found"}
-                    
-                return {"status": "success", "data": {
-                    'id': result.id,
-                    'name': result.name,
-                    'type': result.type,
-                    'img': result.img,
-                    'unit_id': result.unit_id,
-                    'components': [{
-                        'id': comp.id,
-                        'name': comp.name,
-                        'type': comp.type,
-                        'content': comp.content
-                    } for comp in result.components]
-                }}
-            finally:
-                session.close()
+
+                if fields:
+                    return {"status": "success", "data": serialize(row)}
+                return {"status": "success", "data": self.attach_children(session, [serialize(row)])[0]}
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
+
+    def get_all(self, fields: Optional[Sequence[str]] = None,
+                limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """Get all lessons, optionally only the named fields (no components).
+
+        Pass limit, then each result's next_cursor, to read one page at a time.
+        """
+        try:
+            with self.session_scope() as session:
+                statement, serialize = self.page_reader(fields or self.DEFAULT_FIELDS)
+                rows = session.execute(self.paged(statement, limit, cursor)).all()
+                result = self.page_result(rows, limit, serialize)
+                if not fields:
+                    self.attach_children(session, result["data"])
+                return result
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
+
+    def get_by_unit_id(self, unit_id: int, fields: Optional[Sequence[str]] = None) -> Dict:
+        """Get all lessons for a specific unit, optionally only the named fields (no components).
+
+        Served from the curriculum cache until a curriculum write.
+        """
+        try:
+            with self.session_scope() as session:
+                def load():
+                    statement, serialize = self.reader(fields or self.DEFAULT_FIELDS)
+                    rows = session.execute(statement.where(Lesson.unit_id == unit_id).order_by(Lesson.id))
+                    lesson_list = [serialize(row) for row in rows]
+                    if not fields:
+                        self.attach_children(session, lesson_list)
+                    return {"status": "success", "data": lesson_list}
+
+                key = ('get_by_unit_id', unit_id, tuple(fields) if fields else None)
+                return self.curriculum_cache.get(session, key, load)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get_all(self) -> Dict:
-        """Get all lessons"""
+    def get_lesson_version(self, lesson_id: int) -> Dict:
+        """Version of everything a lesson page shows, for its ETag.
+
+        The lesson's and its unit's updated_at, and the count and latest
+        updated_at of its components. Served from the curriculum cache until a
+        curriculum write.
+        """
         try:
-            session = self.Session()
-            try:
-                lessons = session.query(Lesson).options(joinedload(Lesson.components)).order_by(Lesson.id).all()
-                
-                lesson_list = [{
-                    'id': lesson.id,
-                    'name': lesson.name,
-                    'type': lesson.type,
-                    'img': lesson.img,
-                    'unit_id': lesson.unit_id,
-                    'components': [{
-                        'id': comp.id,
-                        'name': comp.name,
-                        'type': comp.type,
-                        'content': comp.content
-                    } for comp in lesson.components]
-                } for lesson in lessons]
-                
-                return {"status": "success", "data": lesson_list}
-            finally:
-                session.close()
+            with self.session_scope() as session:
+                def load():
+                    in_lesson = LessonComponent.lesson_id == lesson_id
+                    row = session.execute(select(
+                        Lesson.updated_at, Unit.updated_at,
+                        select(func.count(LessonComponent.id)).where(in_lesson).scalar_subquery(),
+                        select(func.max(LessonComponent.updated_at)).where(in_lesson).scalar_subquery()
+                    ).select_from(Lesson).outerjoin(
+                        Unit, Unit.id == Lesson.unit_id
+                    ).where(Lesson.id == lesson_id)).first()
+                    if row is None:
+                        return {"status": "error", "data": "Lesson not found"}
+                    return self.version_result(row)
+
+                return self.curriculum_cache.get(session, ('get_lesson_version', lesson_id), load)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get_by_unit_id(self, unit_id: int) -> Dict:
-        """Get all lessons for a specific unit"""
+    def get_lesson_page(self, lesson_id: int, component_id: Optional[int] = None) -> Dict:
+        """Get everything the lesson page renders in a single query.
+
+        Args:
+            lesson_id: Lesson to show
+            component_id: Component whose content is shown, if any
+
+        Returns:
+            Dict with keys:
+                status: "success" or "error"
+                data: Dict with unit (id, name), lesson, components (id, name, type
+                    summaries for the navigation) and current_component (the
+                    selected component with its stored content and, as view,
+                    that content decoded; or None)
+        """
         try:
-            session = self.Session()
-            try:
-                lessons = session.query(Lesson).filter(Lesson.unit_id == unit_id).options(joinedload(Lesson.components)).order_by(Lesson.id).all()
-                
-                lesson_list = [{
-                    'id': lesson.id,
-                    'name': lesson.name,
-                    'type': lesson.type,
-                    'img': lesson.img,
-                    'unit_id': lesson.unit_id,
-                    'components': [{
-                        'id': comp.id,
-                        'name': comp.name,
-                        'type': comp.type,
-                        'content': comp.content
-                    } for comp in lesson.components]
-                } for lesson in lessons]
-                
-                return {"status": "success", "data": lesson_list}
-            finally:
-                session.close()
+            with self.session_scope() as session:
+                # Only the selected component's content is read, the rest are summaries
+                selected_content = case((LessonComponent.id == component_id, LessonComponent.content), else_=None)
+                rows = session.execute(select(
+                    Lesson.id, Lesson.name, Lesson.type, Lesson.img, Lesson.unit_id,
+                    Unit.name,
+                    LessonComponent.id, LessonComponent.name, LessonComponent.type, selected_content
+                ).select_from(Lesson).outerjoin(
+                    Unit, Unit.id == Lesson.unit_id
+                ).outerjoin(
+                    LessonComponent, LessonComponent.lesson_id == Lesson.id
+                ).where(Lesson.id == lesson_id).order_by(LessonComponent.id)).all()
+
+            if not rows:
+                return {"status": "error", "data": "Lesson not found"}
+
+            lesson_id, lesson_name, lesson_type, lesson_img, unit_id, unit_name = rows[0][:6]
+            page = {
+                'unit': {'id': unit_id, 'name': unit_name} if unit_name is not None else None,
+                'lesson': {
+                    'id': lesson_id,
+                    'name': lesson_name,
+                    'type': lesson_type,
+                    'img': lesson_img,
+                    'unit_id': unit_id
+                },
+                'components': [],
+                'current_component': None
+            }
+            for row in rows:
+                comp_id, comp_name, comp_type, comp_content = row[6:]
+                if comp_id is None:
+                    continue
+                page['components'].append({'id': comp_id, 'name': comp_name, 'type': comp_type})
+                if comp_id == component_id:
+                    page['current_component'] = {
+                        'id': comp_id,
+                        'name': comp_name,
+                        'lesson_id': lesson_id,
+                        'type': comp_type,
+                        'content': comp_content,
+                        'view': self.content_views.get(comp_id, comp_type, comp_content)
+                    }
+
+            return {"status": "success", "data": page}
         except Exception as e:
             return {"status": "error", "data": str(e)}
-            
+
     def update(self, lesson_info: Dict) -> Dict:
-        """Update a lesson"""        
+        """Update a lesson"""
         try:
             if 'id' not in lesson_info:
                 return {"status": "error", "data": "Lesson ID is required"}
-                
-            exists_result = self.exists(id=lesson_info['id'])
-            if exists_result["status"] == "success" and not exists_result["data"]:
-                return {"status": "error", "data": f"Lesson with id {lesson_info['id']} not found"}
-                
-            session = self.Session()
-            try:
-                lesson = session.query(Lesson).filter(Lesson.id == lesson_info['id']).first()
-                
-                # Update fields if provided
-                if 'name' in lesson_info:
-                    lesson.name = lesson_info['name']
-                if 'type' in lesson_info:
-                    lesson.type = lesson_info['type']
-                if 'img' in lesson_info:
-                    lesson.img = lesson_info['img']
-                if 'unit_id' in lesson_info:
-                    lesson.unit_id = lesson_info['unit_id']
-                
-                session.commit()
-                
-                return {"status": "success", "data": {
-                    'id': lesson.id,
-                    'name': lesson.name,
-                    'type': lesson.type,
-                    'img': lesson.img,
-                    'unit_id': lesson.unit_id
-                }}
-            finally:
-                session.close()
+
+            values = {field: lesson_info[field] for field in ('name', 'type', 'img', 'unit_id')
+                      if field in lesson_info}
+
+            def update_lesson(session):
+                lesson = self.update_returning(session, Lesson.id == lesson_info['id'], values,
+                                               ('id', 'name', 'type', 'img', 'unit_id'))
+                if not lesson:
+                    return {"status": "error", "data": f"Lesson with id {lesson_info['id']} not found"}
+                return {"status": "success", "data": lesson}
+
+            return self.run_write(update_lesson)
         except Exception as e:
             return {"status": "error", "data": str(e)}
-            
+
     def remove(self, lesson: Optional[str] = None, id: Optional[int] = None) -> Dict:
-        """Remove a lesson"""
+        """Remove a lesson with its components.
+
+        Runs two set-based DELETEs (components, lesson) in one transaction and
+        returns how many rows of each were removed.
+        """
         try:
             if lesson is None and id is None:
                 return {"status": "error", "data": "Either lesson name or id must be provided"}
-                
-            session = self.Session()
-            try:
-                query = session.query(Lesson)
-                if lesson:
-                    query = query.filter(Lesson.name == lesson)
-                if id:
-                    query = query.filter(Lesson.id == id)
-                    
-                result = query.first()
-                if not result:
+
+            lesson_ids = select(Lesson.id)
+            if lesson:
+                lesson_ids = lesson_ids.where(Lesson.name == lesson)
+            if id:
+                lesson_ids = lesson_ids.where(Lesson.id == id)
+
+            def remove_lesson(session):
+                counts = {}
+                for table, stmt in (
+                    ('lesson_components', delete(LessonComponent).where(LessonComponent.lesson_id.in_(lesson_ids))),
+                    ('lessons', delete(Lesson).where(Lesson.id.in_(lesson_ids))),
+                ):
+                    counts[table] = session.execute(stmt.execution_options(synchronize_session=False)).rowcount
+
+                if not counts['lessons']:
                     return {"status": "error", "data": "Lesson not found"}
-                    
-                session.delete(result)
-                session.commit()
-                
-                return {"status": "success", "data": "Lesson removed successfully"}
-            finally:
-                session.close()
+                return {"status": "success", "data": counts}
+
+            return self.run_write(remove_lesson)
         except Exception as e:
-            return {"status": "error", "data": str(e)}
\ No newline at end of file
+            return {"status": "error", "data": str(e)}
@@ -0,0 +1,114 @@
+from typing import Callable, List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from .database import CURRICULUM_TRIGGERS
+
+
+class MigrationError(Exception):
+    """Raised when a database cannot be migrated until its data is fixed by hand"""
+
+
+def column_exists(connection: Connection, table: str, column: str) -> bool:
+    """Check if a table already has a column"""
+    return any(c['name'] == column for c in inspect(connection).get_columns(table))
+
+
+def add_user_auth_epoch(connection: Connection) -> None:
+    """Add the auth epoch counter that invalidates signed session claims"""
+    if not column_exists(connection, 'users', 'auth_epoch'):
+        connection.execute(text("ALTER TABLE users ADD COLUMN auth_epoch INTEGER NOT NULL DEFAULT 0"))
+
+
+def add_unique_names(connection: Connection) -> None:
+    """Back the unit, lesson and component create checks with unique indexes.
+
+    The creates rely on these indexes for ON CONFLICT (name), so a database
+    with duplicate names is refused until they are renamed.
+
+    Raises:
+        MigrationError: Listing every duplicate name
+    """
+    indexes = [
+        ('uq_units_name', 'units'),
+        ('uq_lessons_name', 'lessons'),
+        ('uq_lesson_components_name', 'lesson_components'),
+    ]
+    duplicates = []
+    for index, table in indexes:
+        for name, count in connection.execute(text(
+            f"SELECT name, COUNT(*) FROM {table} WHERE name IS NOT NULL GROUP BY name HAVING COUNT(*) > 1"
+        )):
+            duplicates.append(f"{table}.name '{name}' ({count} rows)")
+    if duplicates:
+        raise MigrationError(f"Cannot add the unique name indexes, rename the duplicates and restart: "
+                             f"{', '.join(duplicates)}")
+    for index, table in indexes:
+        connection.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table} (name)"))
+
+
+def add_foreign_key_indexes(connection: Connection) -> None:
+    """Index the columns the lesson, component and team listings filter on"""
+    for index, table, column in [
+        ('ix_lessons_unit_id', 'lessons', 'unit_id'),
+        ('ix_lesson_components_lesson_id', 'lesson_components', 'lesson_id'),
+        ('ix_users_team_id', 'users', 'team_id'),
+    ]:
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({column})"))
+
+
+def add_curriculum_generation(connection: Connection) -> None:
+    """Add the generation counter that curriculum writes bump for the in-process caches"""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS cache_generations (name VARCHAR PRIMARY KEY, generation INTEGER NOT NULL)"
+    ))
+    for trigger in CURRICULUM_TRIGGERS:
+        connection.execute(text(trigger))
+
+
+def add_updated_at(connection: Connection) -> None:
+    """Add the updated_at columns the curriculum pages' ETags are built from"""
+    for table in ('units', 'lessons', 'lesson_components'):
+        if not column_exists(connection, table, 'updated_at'):
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME"))
+        connection.execute(text(f"UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL"))
+
+
+# Applied in order, once per database. Every step must also be safe on a
+# database that create_all() just built with the current schema, and safe to
+# repeat: a step that raises stops the start, and the steps run before it may
+# not be recorded.
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ('0001_user_auth_epoch', add_user_auth_epoch),
+    ('0002_unique_names', add_unique_names),
+    ('0003_foreign_key_indexes', add_foreign_key_indexes),
+    # 0004_remove_orphans is retired (now python -m models.orphans); never reuse the name
+    ('0005_curriculum_generation', add_curriculum_generation),
+    ('0006_updated_at', add_updated_at),
+]
+
+
+def migrate(engine: Engine) -> List[str]:
+    """Bring an existing database up to the current schema.
+
+    Applied step names are recorded in the schema_migrations table.
+
+    Args:
+        engine: Writer engine of the database to migrate
+
+    Returns:
+        List[str]: Names of the steps applied by this call
+
+    Raises:
+        MigrationError: If a step needs the data fixed first
+    """
+    applied = []
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE IF NOT EXISTS schema_migrations (name VARCHAR PRIMARY KEY)"))
+        done = {row[0] for row in connection.execute(text("SELECT name FROM schema_migrations"))}
+        for name, step in MIGRATIONS:
+            if name in done:
+                continue
+            step(connection)
+            connection.execute(text("INSERT INTO schema_migrations (name) VALUES (:name)"), {'name': name})
+            applied.append(name)
+    return applied
@@ -0,0 +1,63 @@
+"""Find lessons and components whose unit or lesson no longer exists.
+
+    python -m models.orphans [DB_name] [--delete]
+
+Deletes made before remove() cascaded could leave these rows behind. By
+default the command only reports them; with --delete it also removes them.
+Components of an orphaned lesson count as orphans too.
+"""
+import sys
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from .db_runtime import get_runtime
+
+# Table -> condition that makes a row an orphan
+ORPHAN_CONDITIONS: Dict[str, str] = {
+    'lessons': "unit_id IS NULL OR unit_id NOT IN (SELECT id FROM units)",
+    'lesson_components': "lesson_id IS NULL OR lesson_id NOT IN "
+                         "(SELECT id FROM lessons WHERE unit_id IN (SELECT id FROM units))",
+}
+
+
+def find_orphans(connection: Connection, table: str) -> List[str]:
+    """Names of the orphaned rows of a table"""
+    return [row[0] for row in connection.execute(text(
+        f"SELECT name FROM {table} WHERE {ORPHAN_CONDITIONS[table]} ORDER BY id"
+    ))]
+
+
+def remove_orphans(DB_name: Optional[str] = None, delete: bool = False) -> Dict[str, List[str]]:
+    """Report, and optionally delete, orphaned lessons and components.
+
+    Args:
+        DB_name: Database file to clean (defaults to DatabaseConfig.DB_NAME)
+        delete: Delete the orphans instead of only reporting them
+
+    Returns:
+        Dict[str, List[str]]: Names of the orphaned rows, by table
+    """
+    orphans = {}
+    with get_runtime(DB_name).engine.begin() as connection:
+        for table in ORPHAN_CONDITIONS:
+            orphans[table] = find_orphans(connection, table)
+        if delete:
+            for table in ORPHAN_CONDITIONS:
+                connection.execute(text(f"DELETE FROM {table} WHERE {ORPHAN_CONDITIONS[table]}"))
+    return orphans
+
+
+def main(argv: List[str]) -> int:
+    """Print the orphans found and return the exit status"""
+    delete = '--delete' in argv
+    names = [arg for arg in argv if arg != '--delete']
+    orphans = remove_orphans(names[0] if names else None, delete=delete)
+    for table, rows in orphans.items():
+        for name in rows:
+            print(f"{table}: {name}")
+        print(f"{len(rows)} orphaned {table} {'deleted' if delete else 'found'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,180 @@
+"""Check that the models' hot queries are answered from indexes.
+
+    python -m models.query_plans [DB_name]
+
+Every call in HOT_QUERIES is run against a scratch database (an empty one with
+the current schema, or a copy of DB_name so its data and statistics count).
+Each SQL statement the call sends is run through EXPLAIN QUERY PLAN, and the
+command exits with status 1 if a plan scans a table the call is not expected
+to scan.
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from .base_model import BaseModel
+from .database import Base
+from .db_runtime import DatabaseRuntime
+from .lesson_component_model import LessonComponentModel
+from .lesson_model import LessonModel
+from .team_model import TeamModel
+from .unit_model import UnitModel
+from .user_model import UserModel
+
+# (label, call, tables the call may scan in full). Listings of a whole table
+# are allowed to scan it; everything they join to must still be a search.
+HOT_QUERIES: List[Tuple[str, Callable[[Dict], object], Tuple[str, ...]]] = [
+    ('UnitModel.get(id)', lambda m: m['unit'].get(id=1), ()),
+    ('UnitModel.get(name)', lambda m: m['unit'].get(unit='basics'), ()),
+    ('UnitModel.exists(name)', lambda m: m['unit'].exists(unit='basics'), ()),
+    ('UnitModel.get_all', lambda m: m['unit'].get_all(), ('units',)),
+    ('UnitModel.get_all(page)', lambda m: m['unit'].get_all(limit=50, cursor=BaseModel.encode_cursor(1)), ()),
+    # The tree lists every component of every lesson, so reading all of
+    # lesson_components is the query's job, not a missing index.
+    ('UnitModel.get_curriculum_tree', lambda m: m['unit'].get_curriculum_tree(),
+     ('units', 'lesson_components')),
+    ('UnitModel.get_curriculum_version', lambda m: m['unit'].get_curriculum_version(),
+     ('units', 'lessons', 'lesson_components')),
+    ('UnitModel.update', lambda m: m['unit'].update({'id': 1, 'name': 'basics'}), ()),
+    ('UnitModel.remove', lambda m: m['unit'].remove(id=1), ()),
+    ('LessonModel.get(id)', lambda m: m['lesson'].get(id=1), ()),
+    ('LessonModel.get(name)', lambda m: m['lesson'].get(lesson='intro'), ()),
+    ('LessonModel.exists(name)', lambda m: m['lesson'].exists(lesson='intro'), ()),
+    ('LessonModel.get_all', lambda m: m['lesson'].get_all(), ('lessons',)),
+    ('LessonModel.get_all(page)', lambda m: m['lesson'].get_all(limit=50, cursor=BaseModel.encode_cursor(1)), ()),
+    ('LessonModel.get_by_unit_id', lambda m: m['lesson'].get_by_unit_id(1), ()),
+    ('LessonModel.get_many', lambda m: m['lesson'].get_many([1, 2, 3]), ()),
+    ('LessonModel.get_lesson_version', lambda m: m['lesson'].get_lesson_version(1), ()),
+    ('LessonModel.get_lesson_page', lambda m: m['lesson'].get_lesson_page(1, 1), ()),
+    ('LessonModel.update', lambda m: m['lesson'].update({'id': 1, 'name': 'intro'}), ()),
+    ('LessonModel.remove', lambda m: m['lesson'].remove(id=1), ()),
+    ('LessonComponentModel.get(id)', lambda m: m['component'].get(id=1), ()),
+    ('LessonComponentModel.get(name)', lambda m: m['component'].get(lesson_component='welcome'), ()),
+    ('LessonComponentModel.exists(name)', lambda m: m['component'].exists(lesson_component='welcome'), ()),
+    ('LessonComponentModel.get_all', lambda m: m['component'].get_all(), ('lesson_components',)),
+    ('LessonComponentModel.get_all(page)',
+     lambda m: m['component'].get_all(limit=50, cursor=BaseModel.encode_cursor(1)), ()),
+    ('LessonComponentModel.get_by_lesson_id', lambda m: m['component'].get_by_lesson_id(1), ()),
+    ('LessonComponentModel.update', lambda m: m['component'].update({'id': 1, 'name': 'welcome'}), ()),
+    ('TeamModel.get(id)', lambda m: m['team'].get(id=1), ()),
+    ('TeamModel.get(name)', lambda m: m['team'].get(team='pigeons'), ()),
+    ('TeamModel.exists(name)', lambda m: m['team'].exists(team='pigeons'), ()),
+    ('TeamModel.get_all_teams', lambda m: m['team'].get_all_teams(), ('teams',)),
+    ('TeamModel.get_all_teams(page)',
+     lambda m: m['team'].get_all_teams(limit=50, cursor=BaseModel.encode_cursor(1)), ()),
+    ('TeamModel.update_team', lambda m: m['team'].update_team(1, {'name': 'phoenixes'}), ()),
+    ('UserModel.get(email)', lambda m: m['user'].get(email='member@example.com'), ()),
+    ('UserModel.get(google_id)', lambda m: m['user'].get(google_id='g1'), ()),
+    ('UserModel.get_many', lambda m: m['user'].get_many(['g1', 'g2']), ()),
+    ('UserModel.exists(email)', lambda m: m['user'].exists(email='member@example.com'), ()),
+    ('UserModel.upsert',
+     lambda m: m['user'].upsert({'google_id': 'g1', 'name': 'Member', 'email': 'member@example.com'}), ()),
+    ('UserModel.get_auth_epoch', lambda m: m['user'].get_auth_epoch('g1'), ()),
+    ('UserModel.update', lambda m: m['user'].update({'google_id': 'g1', 'name': 'Member'}), ()),
+    ('UserModel.get_all(page)',
+     lambda m: m['user'].get_all(fields=('email', 'team_id', 'access'), limit=50,
+                                 cursor=BaseModel.encode_cursor('member@example.com')), ()),
+]
+
+# "SCAN lessons" is a full table scan, and so is "SCAN lessons USING INDEX ...",
+# which walks an index in order and then reads every row; only "SCAN lessons
+# USING COVERING INDEX ..." reads just the index and is fine. SQLAlchemy aliases a joined table as
+# e.g. lessons_1, and "SCAN anon_1" walks a subquery, not a table.
+SCAN_PATTERN = re.compile(r'^SCAN (\w+)(?: AS \w+)?(.*)$')
+ALIAS_SUFFIX = re.compile(r'_\d+$')
+
+
+def table_scans(plan: List[str], allowed: Tuple[str, ...] = ()) -> List[str]:
+    """Return the tables a query plan scans in full, apart from the allowed ones"""
+    scans = []
+    for detail in plan:
+        match = SCAN_PATTERN.match(detail)
+        if not match or 'USING COVERING INDEX' in match.group(2):
+            continue
+        name = match.group(1)
+        if name not in Base.metadata.tables:
+            name = ALIAS_SUFFIX.sub('', name)
+        if name in Base.metadata.tables and name not in allowed:
+            scans.append(name)
+    return scans
+
+
+def explain(connection, statement: str, parameters) -> List[str]:
+    """Run EXPLAIN QUERY PLAN for one statement and return the plan's detail lines"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def check(DB_name: Optional[str] = None, verbose: bool = False) -> List[str]:
+    """Explain every statement sent by HOT_QUERIES.
+
+    Args:
+        DB_name: Database file to copy and check; an empty database is used if omitted
+        verbose: Print every plan, not just the failures
+
+    Returns:
+        List[str]: One message per statement that scans a table it should not
+    """
+    scratch = tempfile.mkdtemp()
+    path = os.path.join(scratch, 'query_plans.db')
+    if DB_name:
+        shutil.copy(DB_name, path)
+    runtime = DatabaseRuntime(path)
+    try:
+        user_model = UserModel()
+        models = {
+            'unit': UnitModel(),
+            'lesson': LessonModel(),
+            'component': LessonComponentModel(),
+            'team': TeamModel(user_model),
+            'user': user_model,
+        }
+        for model in models.values():
+            model.initialize_DB(runtime=runtime)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(runtime.engine, 'before_cursor_execute', record)
+        failures = []
+        for label, call, allowed in HOT_QUERIES:
+            statements.clear()
+            call(models)
+            sent = list(statements)
+            raw = runtime.engine.raw_connection()
+            try:
+                for statement, parameters in sent:
+                    plan = explain(raw, statement, parameters)
+                    if verbose:
+                        print(f"{label}: {' | '.join(plan)}")
+                    for table in table_scans(plan, allowed):
+                        failures.append(f"{label} scans {table}: {statement.strip()}")
+            finally:
+                raw.close()
+        event.remove(runtime.engine, 'before_cursor_execute', record)
+        return failures
+    finally:
+        runtime.dispose()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main(argv: List[str]) -> int:
+    """Print the failures and return the exit status"""
+    failures = check(argv[0] if argv else None, verbose=True)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(HOT_QUERIES)} queries checked, {len(failures)} table scan(s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
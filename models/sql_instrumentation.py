@@ -0,0 +1,104 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from flask import has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger('robosite.sql')
+
+
+def current_endpoint() -> str:
+    """Name of the Flask endpoint running the statement, or '<no request>'"""
+    if has_request_context():
+        return request.endpoint or '<unmatched>'
+    return '<no request>'
+
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Describe bound parameters by type only, so values never reach the logs.
+
+    Args:
+        parameters: The DBAPI parameters for the statement
+        executemany: Whether parameters is a list of parameter sets
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return {'rows': len(rows), 'each': parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    return [type(value).__name__ for value in (parameters or ())]
+
+
+class SQLInstrumentation:
+    """
+    SQLInstrumentation - Times every statement on an engine
+
+    Statements slower than the threshold are logged to the 'robosite.sql' logger
+    with their parameter shape and endpoint. Every statement is counted per
+    endpoint so totals can be inspected later through snapshot().
+    """
+
+    def __init__(self, slow_query_ms: float):
+        """Initialize the instrumentation.
+
+        Args:
+            slow_query_ms: Statements taking at least this long are logged
+        """
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict] = {}
+
+    def attach(self, engine) -> None:
+        """Start timing statements executed on an engine"""
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info['query_start_time'].pop()) * 1000
+        endpoint = current_endpoint()
+        slow = elapsed_ms >= self.slow_query_ms
+        self._record(endpoint, elapsed_ms, slow)
+
+        if slow:
+            shape = parameter_shape(parameters, executemany)
+            logger.warning(
+                "slow query %.1f ms on %s: %s params=%s",
+                elapsed_ms, endpoint, ' '.join(statement.split()), shape,
+                extra={
+                    'duration_ms': round(elapsed_ms, 3),
+                    'endpoint': endpoint,
+                    'statement': statement,
+                    'parameter_shape': shape,
+                },
+            )
+
+    def _record(self, endpoint: str, elapsed_ms: float, slow: bool) -> None:
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'queries': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'slow_queries': 0
+            })
+            stats['queries'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if slow:
+                stats['slow_queries'] += 1
+
+    def snapshot(self, endpoint: Optional[str] = None) -> Dict:
+        """Per-endpoint query counts and SQL time collected so far.
+
+        Args:
+            endpoint: Only return the stats for this endpoint
+        """
+        with self._lock:
+            if endpoint is not None:
+                return dict(self._endpoints.get(endpoint, {}))
+            return {name: dict(stats) for name, stats in self._endpoints.items()}
+
+    def reset(self) -> None:
+        """Forget all collected stats"""
+        with self._lock:
+            self._endpoints.clear()
@@ -1,45 +1,31 @@
-import os
-from typing import Dict, List, Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, joinedload
+import json
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert
 from .database import Base, Team, User
+from .base_model import BaseModel
 from models.user_model import UserModel
 
-class TeamModel:
+class TeamModel(BaseModel):
     """
     Team Model - Handles all interactions with the team database using SQLAlchemy
     """
-    
+
+    ENTITY = Team
+    FIELDS = {'id': Team.id, 'name': Team.name}
+    DEFAULT_FIELDS = ('name', 'id')
+    CHILDREN = ('members', User.team_id, {
+        'email': User.email,
+        'access': User.access,
+        'team_id': User.team_id
+    })
+
     def __init__(self, user_model:UserModel):
         """Initialize the Team Model."""
-        self.engine = None
-        self.Session = None
-        self.user_model = UserModel()
-
-    def initialize_DB(self, DB_name: str) -> None:
-        """Initialize SQLite database and ensure tables exist.
-        Args:
-            DB_name: Name of the database file or SQLite URL
-        """
-        try:
-            # Initialize database connection
-            if DB_name.startswith('sqlite:///'):
-                self.engine = create_engine(DB_name, echo=True)  # Add echo=True for debugging
-            else:
-                db_dir = os.path.dirname(DB_name)
-                db_name = os.path.splitext(os.path.basename(DB_name))[0] + '.db'
-                db_path = os.path.join(db_dir, db_name)
-                os.makedirs(os.path.dirname(db_path), exist_ok=True)
-                self.engine = create_engine(f'sqlite:///{db_path}', echo=True)
-
-            Base.metadata.create_all(self.engine)
-            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)  # Add expire_on_commit=False
-            
-        except Exception as e:
-            print(f"Error initializing database: {str(e)}")
-            raise
+        super().__init__()
+        self.user_model = user_model
+
 
-        
     def exists(self, team: Optional[str] = None, id: Optional[int] = None) -> Dict:
         """
         Check if a team exists by name or id
@@ -47,105 +33,69 @@ class TeamModel:
         if team is None and id is None:
             return {"status": "error", "data": "No team name or id input"}
 
-        session = self.Session()
-        try:
-            query = session.query(Team)
-            if team:
-                team_exists = query.filter_by(name=team).first() is not None
-            else:
-                team_exists = query.filter_by(id=id).first() is not None
+        with self.session_scope() as session:
+            criterion = Team.name == team if team else Team.id == id
+            team_exists = session.execute(select(Team.id).where(criterion).limit(1)).first() is not None
             return {"status": "success", "data": team_exists}
-        finally:
-            session.close()
 
     def create(self, team_name: str) -> Dict:
         """
-        Create a new team
+        Create a new team (one INSERT, duplicates are caught by the unique constraint)
         """
         try:
-            exists_result = self.exists(team=team_name)
-            if exists_result["status"] == "success" and exists_result["data"]:
-                return {"status": "error", "data": f"Team {team_name} already exists"}
+            stmt = insert(Team).values(name=team_name).on_conflict_do_nothing(
+                index_elements=[Team.name]
+            ).returning(Team.id, Team.name)
 
-            session = self.Session()
-            try:
-                new_team = Team(name=team_name)
-                session.add(new_team)
-                session.commit()
+            def create_team(session):
+                new_team = session.execute(stmt).first()
+                if new_team is None:
+                    return {"status": "error", "data": f"Team {team_name} already exists"}
 
                 return {"status": "success", "data": {
                     'name': new_team.name,
                     'id': new_team.id,
                     'members': []
                 }}
-            except Exception as e:
-                session.rollback()
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
+
+            return self.run_write(create_team)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
 
-    def get(self, team: str = None, id: int = None) -> Dict:
+    def get(self, team: str = None, id: int = None, fields: Optional[Sequence[str]] = None) -> Dict:
         """
-        Get a team by name or id
+        Get a team by name or id, optionally only the named fields
         """
         try:
             if team is None and id is None:
                 return {"status": "error", "data": "Either team name or id must be provided"}
 
-            session = self.Session()
-            try:
-                query = session.query(Team).options(joinedload(Team.users))
-                if team:
-                    team_obj = query.filter_by(name=team).first()
-                else:
-                    team_obj = query.filter_by(id=id).first()
-
-                if not team_obj:
+            with self.session_scope() as session:
+                statement, serialize = self.reader(fields or self.DEFAULT_FIELDS)
+                criterion = Team.name == team if team else Team.id == id
+                row = session.execute(statement.where(criterion)).first()
+                if not row:
                     return {"status": "error", "data": "Team not found"}
-
-
-                return {"status": "success", "data": {
-                    'name': team_obj.name,
-                    'id': team_obj.id
-                    # 'members': [self.user_model.get(email=user.email)["data"] for user in team_obj.users]
-                }}
-            finally:
-                session.close()
+                return {"status": "success", "data": serialize(row)}
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get_all_teams(self) -> Dict:
-        """Get all teams with full member information"""
+    def get_all_teams(self, fields: Optional[Sequence[str]] = None,
+                      limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """Get all teams with full member information, or only the named team fields.
+
+        Pass limit, then each result's next_cursor, to read one page of teams at a time.
+        """
         try:
-            session = self.Session()
-            try:
-                # Use joinedload to avoid N+1 query problem
-                teams = session.query(Team).options(joinedload(Team.users)).all()
-                
-                # Proper serialization of team and user data
-                team_list = []
-                for team in teams:
-                    team_data = {
-                        'name': team.name,
-                        'id': team.id,
-                        'members': []
-                    }
-                    for user in team.users:
-                        team_data['members'].append({
-                            'email': user.email,
-                            'access': user.access,
-                            'team_id': user.team_id
-                        })
-                    team_list.append(team_data)
-                
-                return {"status": "success", "data": team_list}
-            except Exception as e:
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
+            with self.session_scope() as session:
+                statement, serialize = self.page_reader(fields or self.DEFAULT_FIELDS)
+                rows = session.execute(self.paged(statement, limit, cursor)).all()
+                result = self.page_result(rows, limit, serialize)
+                if not fields:
+                    # Members of the whole page in one query, not one per team
+                    self.attach_children(session, result["data"])
+                return result
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
@@ -154,27 +104,25 @@ class TeamModel:
         Update a team
         """
         try:
-            session = self.Session()
-            try:
-                team = session.query(Team).options(joinedload(Team.users)).filter_by(id=id).first()
-                if not team:
-                    return {"status": "error", "data": f"Team with id {id} not found"}
+            values = {field: new_data[field] for field in ('name',) if field in new_data}
+            # Member emails come back in the same statement as a JSON array
+            members = select(func.json_group_array(User.email)).where(User.team_id == Team.id).scalar_subquery()
 
-                # Update only allowed fields
-                if 'name' in new_data:
-                    team.name = new_data['name']
-
-                session.commit()
+            def update_team(session):
+                if values:
+                    stmt = update(Team).where(Team.id == id).values(values).returning(Team.name, Team.id, members)
+                else:
+                    stmt = select(Team.name, Team.id, members).where(Team.id == id)
+                row = session.execute(stmt.execution_options(synchronize_session=False)).first()
+                if not row:
+                    return {"status": "error", "data": f"Team with id {id} not found"}
 
                 return {"status": "success", "data": {
-                    'name': team.name,
-                    'id': team.id,
-                    'members': [user.email for user in team.users]
+                    'name': row[0],
+                    'id': row[1],
+                    'members': json.loads(row[2])
                 }}
-            except Exception as e:
-                session.rollback()
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
+
+            return self.run_write(update_team)
         except Exception as e:
-            return {"status": "error", "data": str(e)}
\ No newline at end of file
+            return {"status": "error", "data": str(e)}
@@ -1,184 +1,206 @@
-import os
-from typing import Dict, Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, joinedload
-from .database import Base, Unit, Lesson
-
-class UnitModel:
+from typing import Dict, Optional, Sequence
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from .database import Base, Unit, Lesson, LessonComponent
+from .base_model import BaseModel
+from .generation_cache import GenerationCache
+
+class UnitModel(BaseModel):
     """
     Unit Model - Handles all interactions with the unit database using SQLAlchemy
     """
-    
+
+    ENTITY = Unit
+    FIELDS = {'id': Unit.id, 'name': Unit.name}
+    DEFAULT_FIELDS = ('name', 'id')
+
     def __init__(self):
         """Initialize the Unit Model."""
-        self.engine = None
-        self.Session = None
-
-    def initialize_DB(self, DB_name: str) -> None:
-        """Initialize SQLite database and ensure tables exist.
-        Args:
-            DB_name: Name of the database file or SQLite URL
-        """
-        try:
-            # Initialize database connection
-            if DB_name.startswith('sqlite:///'):
-                self.engine = create_engine(DB_name, echo=True)  # Add echo=True for debugging
-            else:
-                db_dir = os.path.dirname(DB_name)
-                db_name = os.path.splitext(os.path.basename(DB_name))[0] + '.db'
-                db_path = os.path.join(db_dir, db_name)
-                os.makedirs(os.path.dirname(db_path), exist_ok=True)
-                self.engine = create_engine(f'sqlite:///{db_path}', echo=True)
-
-            Base.metadata.create_all(self.engine)
-            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)  # Add expire_on_commit=False
-            
-        except Exception as e:            
-            print(f"Error initializing database: {str(e)}")
-            raise
+        super().__init__()
+        self.curriculum_cache = GenerationCache('curriculum')
 
     def exists(self, unit: Optional[str] = None, id: Optional[int] = None) -> Dict:
         """Check if a unit exists by name or id"""
         if unit is None and id is None:
             return {"status": "error", "data": "No unit name or id input"}
 
-        session = self.Session()
-        try:
-            query = session.query(Unit)
-            if unit:
-                unit_exists = query.filter_by(name=unit).first() is not None
-                return {"status": "success", "data": unit_exists}
-
-            else:
-                unit_exists = query.filter_by(id=id).first() is not None            
-                return {"status": "success", "data": unit_exists}
-        finally:
-            session.close()
+        with self.session_scope() as session:
+            criterion = Unit.name == unit if unit else Unit.id == id
+            unit_exists = session.execute(select(Unit.id).where(criterion).limit(1)).first() is not None
+            return {"status": "success", "data": unit_exists}
 
     def create(self, unit_name: str) -> Dict:
-        """Create a new unit"""
+        """Create a new unit (one INSERT, duplicates are caught by the unique index)"""
         try:
-            exists_result = self.exists(unit=unit_name)
-            if exists_result["status"] == "success" and exists_result["data"]==True:
-                return {"status": "error", "data": f"Unit {unit_name} already exists"}
+            stmt = insert(Unit).values(name=unit_name).on_conflict_do_nothing(
+                index_elements=[Unit.name]
+            ).returning(Unit.id, Unit.name)
 
-            session = self.Session()
-            try:
-                new_unit = Unit(name=unit_name)
-                session.add(new_unit)
-                session.commit()
+            def create_unit(session):
+                new_unit = session.execute(stmt).first()
+                if new_unit is None:
+                    return {"status": "error", "data": f"Unit {unit_name} already exists"}
 
                 return {"status": "success", "data": {
                     'name': new_unit.name,
                     'id': new_unit.id
                 }}
-            except Exception as e:
-                session.rollback()
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
+
+            return self.run_write(create_unit)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get(self, unit: str = None, id: int = None) -> Dict:
-        """Get a unit by name or id"""
+    def get(self, unit: str = None, id: int = None, fields: Optional[Sequence[str]] = None) -> Dict:
+        """Get a unit by name or id, optionally only the named fields"""
         try:
             if unit is None and id is None:
                 return {"status": "error", "data": "Either unit name or id must be provided"}
 
-            session = self.Session()
-            try:
-                query = session.query(Unit).options(joinedload(Unit.lessons))
-                if unit:
-                    unit_obj = query.filter_by(name=unit).first()
-                else:
-                    unit_obj = query.filter_by(id=id).first()
-
-                if not unit_obj:
+            with self.session_scope() as session:
+                statement, serialize = self.reader(fields or self.DEFAULT_FIELDS)
+                criterion = Unit.name == unit if unit else Unit.id == id
+                row = session.execute(statement.where(criterion)).first()
+                if not row:
                     return {"status": "error", "data": "Unit not found"}
+                return {"status": "success", "data": serialize(row)}
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
 
-                return {"status": "success", "data": {
-                    'name': unit_obj.name,
-                    'id': unit_obj.id
-                }}
-            finally:
-                session.close()
+    def get_all(self, fields: Optional[Sequence[str]] = None,
+                limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """Get all units, optionally only the named fields.
+
+        Pass limit, then each result's next_cursor, to read one page at a time.
+        Served from the curriculum cache until a curriculum write.
+        """
+        try:
+            with self.session_scope() as session:
+                def load():
+                    statement, serialize = self.page_reader(fields or self.DEFAULT_FIELDS)
+                    rows = session.execute(self.paged(statement, limit, cursor)).all()
+                    return self.page_result(rows, limit, serialize)
+
+                key = ('get_all', tuple(fields) if fields else None, limit, cursor)
+                return self.curriculum_cache.get(session, key, load)
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
+
+    def get_curriculum_tree(self) -> Dict:
+        """Get every unit with its lessons and component summaries.
+
+        Two set-based queries regardless of curriculum size: units joined to
+        their lessons, then the components of all lessons. Component content is
+        not loaded, only id, name and type. Served from the curriculum cache
+        until a curriculum write.
+        """
+        try:
+            with self.session_scope() as session:
+                return self.curriculum_cache.get(session, ('get_curriculum_tree',), lambda: self._load_curriculum_tree(session))
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
-    def get_all(self) -> Dict:
-        """Get all units"""
+    def get_curriculum_version(self) -> Dict:
+        """Version of everything the units page shows, for its ETag.
+
+        The row count and latest updated_at of units, lessons and components:
+        inserts and updates move an updated_at, deletes move a count. Served
+        from the curriculum cache until a curriculum write.
+        """
         try:
-            session = self.Session()
-            try:
-                units = session.query(Unit).options(joinedload(Unit.lessons)).order_by(Unit.id).all()
-                
-                unit_list = [{
-                    'name': unit.name,
-                    'id': unit.id
-                } for unit in units]
-                
-                return {"status": "success", "data": unit_list}
-            finally:
-                session.close()
+            with self.session_scope() as session:
+                def load():
+                    columns = []
+                    for table in (Unit, Lesson, LessonComponent):
+                        columns.append(select(func.count()).select_from(table).scalar_subquery())
+                        columns.append(select(func.max(table.updated_at)).scalar_subquery())
+                    return self.version_result(session.execute(select(*columns)).one())
+
+                return self.curriculum_cache.get(session, ('get_curriculum_version',), load)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
+    def _load_curriculum_tree(self, session) -> Dict:
+        """Run the two queries behind get_curriculum_tree"""
+        rows = session.execute(select(
+            Unit.id, Unit.name,
+            Lesson.id, Lesson.name, Lesson.type, Lesson.img
+        ).outerjoin(Lesson, Lesson.unit_id == Unit.id).order_by(Unit.id, Lesson.id)).all()
+
+        component_rows = session.execute(select(
+            LessonComponent.id, LessonComponent.name, LessonComponent.type, LessonComponent.lesson_id
+        ).order_by(LessonComponent.id)).all()
+
+        # Read in rowid order, one pass over the table; grouping keeps each
+        # lesson's components in id order
+        components = {}
+        for component_id, name, type, lesson_id in component_rows:
+            components.setdefault(lesson_id, []).append({
+                'id': component_id,
+                'name': name,
+                'type': type
+            })
+
+        units = {}
+        for unit_id, unit_name, lesson_id, lesson_name, lesson_type, lesson_img in rows:
+            unit = units.get(unit_id)
+            if unit is None:
+                unit = units[unit_id] = {'name': unit_name, 'id': unit_id, 'lessons': []}
+            if lesson_id is not None:
+                unit['lessons'].append({
+                    'id': lesson_id,
+                    'name': lesson_name,
+                    'type': lesson_type,
+                    'img': lesson_img,
+                    'unit_id': unit_id,
+                    'components': components.get(lesson_id, [])
+                })
+
+        return {"status": "success", "data": list(units.values())}
+
     def update(self, unit_info: Dict) -> Dict:
         """Update a unit"""
         try:
             if 'id' not in unit_info:
                 return {"status": "error", "data": "Unit ID is required"}
 
-            session = self.Session()
-            try:
-                unit = session.query(Unit).filter_by(id=unit_info['id']).first()
+            values = {field: unit_info[field] for field in ('name',) if field in unit_info}
+
+            def update_unit(session):
+                unit = self.update_returning(session, Unit.id == unit_info['id'], values, ('name', 'id'))
                 if not unit:
                     return {"status": "error", "data": f"Unit with id {unit_info['id']} not found"}
+                return {"status": "success", "data": unit}
 
-                # Update allowed fields
-                if 'name' in unit_info:
-                    unit.name = unit_info['name']
-
-                session.commit()
-
-                return {"status": "success", "data": {
-                    'name': unit.name,
-                    'id': unit.id
-                }}
-            except Exception as e:
-                session.rollback()
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
+            return self.run_write(update_unit)
         except Exception as e:
             return {"status": "error", "data": str(e)}
 
     def remove(self, unit: str = None, id: int = None) -> Dict:
-        """Remove a unit"""
+        """Remove a unit with its lessons and their components.
+
+        Runs three set-based DELETEs (components, lessons, unit) in one
+        transaction and returns how many rows of each were removed.
+        """
         try:
             if unit is None and id is None:
                 return {"status": "error", "data": "Either unit name or id must be provided"}
 
-            session = self.Session()
-            try:
-                query = session.query(Unit)
-                if unit:
-                    unit_obj = query.filter_by(name=unit).first()
-                else:
-                    unit_obj = query.filter_by(id=id).first()
+            unit_ids = select(Unit.id).where(Unit.name == unit if unit else Unit.id == id)
+            lesson_ids = select(Lesson.id).where(Lesson.unit_id.in_(unit_ids))
 
-                if not unit_obj:
-                    return {"status": "error", "data": "Unit not found"}
+            def remove_unit(session):
+                counts = {}
+                for table, stmt in (
+                    ('lesson_components', delete(LessonComponent).where(LessonComponent.lesson_id.in_(lesson_ids))),
+                    ('lessons', delete(Lesson).where(Lesson.unit_id.in_(unit_ids))),
+                    ('units', delete(Unit).where(Unit.id.in_(unit_ids))),
+                ):
+                    counts[table] = session.execute(stmt.execution_options(synchronize_session=False)).rowcount
 
-                session.delete(unit_obj)
-                session.commit()
+                if not counts['units']:
+                    return {"status": "error", "data": "Unit not found"}
+                return {"status": "success", "data": counts}
 
-                return {"status": "success", "data": "Unit removed successfully"}
-            except Exception as e:
-                session.rollback()
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
+            return self.run_write(remove_unit)
         except Exception as e:
-            return {"status": "error", "data": str(e)}
\ No newline at end of file
+            return {"status": "error", "data": str(e)}
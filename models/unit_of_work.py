@@ -0,0 +1,114 @@
+from flask import g, has_request_context, request
+
+# Methods that can be served from the read-only pool
+READ_ONLY_METHODS = ('GET', 'HEAD')
+
+# Endpoints registered as never writing to the database
+_read_only_endpoints = set()
+
+
+def in_request() -> bool:
+    """Check if there is an active Flask request to scope the session to"""
+    return has_request_context()
+
+
+def mark_read_only(*endpoints: str) -> None:
+    """Route the database work of these endpoints to the read-only pool.
+
+    Only list endpoints that never write: a write attempted on a read-only
+    connection fails with "attempt to write a readonly database".
+    """
+    _read_only_endpoints.update(endpoints)
+
+
+def is_read_only_request() -> bool:
+    """Check if the active request may run entirely on read-only connections"""
+    return (has_request_context()
+            and request.method in READ_ONLY_METHODS
+            and request.endpoint in _read_only_endpoints)
+
+
+def current_session(Session):
+    """Get the session for the active request, opening it on first use.
+
+    Sessions are keyed by their factory so every model bound to the same
+    runtime joins the same session and transaction.
+
+    Args:
+        Session: The sessionmaker the calling model is bound to
+    """
+    sessions = g.setdefault('db_sessions', {})
+    session = sessions.get(Session)
+    if session is None:
+        session = Session()
+        sessions[Session] = session
+    return session
+
+
+def hold_writer(writer) -> bool:
+    """Take the serialized writer slot for the rest of the request.
+
+    The slot is kept until finish() has closed the request's transaction, so no other writer in this
+    process can start while the request's transaction is open.
+
+    Args:
+        writer: The runtime's SerializedWriter
+
+    Returns:
+        bool: True if the slot was taken now, False if the request already held it
+    """
+    if g.get('db_writer') is not None:
+        return False
+    writer.acquire()
+    g.db_writer = writer
+    return True
+
+
+def commit() -> None:
+    """Commit the request's sessions before its response is sent.
+
+    Registered as an after_request hook by the server, so a failed commit can
+    still change the response. A commit that finds the database busy is retried
+    through the writer held by the request.
+
+    Raises:
+        Exception: The commit failure, after every session has been rolled back
+    """
+    sessions = g.get('db_sessions', {})
+    writer = g.get('db_writer')
+    try:
+        for session in sessions.values():
+            if writer is not None and session.in_transaction():
+                session.flush()
+                # A COMMIT refused as busy leaves SQLite's transaction open and
+                # can be repeated, but not through the Session, which gives up
+                # on its transaction after one failed commit
+                dbapi_connection = session.connection().connection.dbapi_connection
+                writer.run(dbapi_connection.commit)
+            session.commit()
+    except Exception:
+        for session in sessions.values():
+            session.rollback()
+        raise
+
+
+def finish(exception=None) -> None:
+    """Roll back whatever the request did not commit and close its sessions.
+
+    Registered as a teardown_request hook by the server. After commit() this
+    only closes the sessions; a request that failed before it is rolled back.
+
+    Args:
+        exception: The unhandled exception that ended the request, if any
+    """
+    sessions = g.pop('db_sessions', {})
+    writer = g.pop('db_writer', None)
+    try:
+        for session in sessions.values():
+            try:
+                session.rollback()
+            finally:
+                session.close()
+    finally:
+        if writer is not None:
+            writer.release()
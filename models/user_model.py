@@ -1,175 +1,165 @@
-import os
-from typing import Dict, Optional, Any
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, joinedload
+from typing import Dict, Optional, Any, Sequence
+from sqlalchemy import case, literal_column, or_, select
+from sqlalchemy.dialects.sqlite import insert
 from .database import Base, User, Team
+from .base_model import BaseModel
 
-class UserModel:
+class UserModel(BaseModel):
     """User Model for database operations"""
+
+    ENTITY = User
+    FIELDS = {
+        'google_id': User.google_id,
+        'name': User.name,
+        'email': User.email,
+        'access': User.access,
+        'team_id': User.team_id,
+        'team_name': Team.name,
+        'auth_epoch': User.auth_epoch
+    }
+    FIELD_JOINS = {'team_name': (Team, User.team_id == Team.id)}
+    PAGE_KEY = 'email'
+    ID_FIELD = 'google_id'
+    DEFAULT_FIELDS = ('google_id', 'name', 'email', 'access', 'team_id', 'team_name', 'auth_epoch')
+    # What get_all returns for each user when no fields are given
+    LIST_FIELDS = ('email', 'team_id', 'access')
+
     def __init__(self):
-        """Initialize the User Model with the database file path."""
-        self.root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.data_dir = os.path.join(self.root_dir, 'data')
-        self.engine = None
-        self.Session = None
-
-    def initialize_DB(self, DB_name: str) -> None:
-        """Initialize SQLite database and ensure tables exist.
-        
-        Args:
-            DB_name: Name of the database file or SQLite URL
+        """Initialize the User Model."""
+        super().__init__()
+
+    def get_auth_epoch(self, google_id: str) -> Dict:
+        """Get a user's auth epoch with one primary key lookup.
+
+        Session claims carry the epoch they were issued at; a different value
+        here means access or team changed since, in any worker process.
+
+        Returns:
+            Dict with keys:
+                status: "success" or "error"
+                data: The epoch, or None if the user no longer exists
         """
         try:
-            # Initialize database connection
-            if DB_name.startswith('sqlite:///'):
-                self.engine = create_engine(DB_name, echo=False)  # Set echo=False to suppress SQL output
-            else:
-                db_path = os.path.join(self.data_dir, DB_name)
-                self.engine = create_engine(f'sqlite:///{db_path}', echo=False)
-            
-            Base.metadata.create_all(self.engine)
-            self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
-            
+            with self.session_scope() as session:
+                epoch = session.execute(
+                    select(User.auth_epoch).where(User.google_id == google_id)
+                ).scalar()
+                return {"status": "success", "data": epoch}
         except Exception as e:
-            print(f"Error initializing database: {str(e)}")
-            raise
+            return {"status": "error", "data": str(e)}
 
     def remove(self, google_id: str) -> Dict:
         """Delete user by google_id"""
         try:
-            session = self.Session()
-            user = session.query(User).filter_by(google_id=google_id).first()
-            if not user:
-                return {"status": "error", "data": "User not found"}
-            
-            session.delete(user)
-            session.commit()
-            return {"status": "success", "data": "User deleted successfully"}
+            def remove_user(session):
+                user = session.query(User).filter_by(google_id=google_id).first()
+                if not user:
+                    return {"status": "error", "data": "User not found"}
+
+                session.delete(user)
+                session.flush()
+                return {"status": "success", "data": "User deleted successfully"}
+
+            return self.run_write(remove_user)
         except Exception as e:
-            session.rollback()
             return {"status": "error", "data": str(e)}
-        finally:
-            session.close()
 
 
+    def get_all(self, fields: Optional[Sequence[str]] = None,
+                limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+        """Get all users from the database, ordered by email.
 
+        Args:
+            fields: Only select these fields (see FIELDS)
+            limit: Return at most this many users and a next_cursor
+            cursor: next_cursor of the previous page
 
-        
-            
-    def get_all(self) -> Dict:
-        """Get all users from the database.
-        
         Returns:
             Dict with keys:
                 status: "success" or "error"
                 data: List of user data dicts or error message
+                next_cursor: Cursor for the following page, or None on the
+                    last page (only when limit is given)
         """
-        session = self.Session()
         try:
-            # Use joinedload to eagerly load team relationship and avoid N+1 queries
-            users = session.query(User).options(joinedload(User.team)).all()
-            return {"status": "success", "data": [
-                {
-                    "email": user.email,
-                    "team_id": user.team_id,
-                    "access": user.access
-                } for user in users
-            ]}
+            with self.session_scope() as session:
+                statement, serialize = self.page_reader(fields or self.LIST_FIELDS)
+                rows = session.execute(self.paged(statement, limit, cursor)).all()
+                return self.page_result(rows, limit, serialize)
         except Exception as e:
             return {"status": "error", "data": str(e)}
-        finally:
-            session.close()
-    
+
     def update(self, user_info: Dict) -> Dict:
         """Update a user's information.
-        
+
         Args:
             user_info: Dictionary containing:
-                google_id: User's Google ID (required)
+                google_id: User's Google ID (or email, one is required)
+                email: User's email, used when no google_id is given
                 name: User's full name (optional)
                 team_id: New team ID (optional)
                 access: New access level (optional)
-                
+
         Returns:
             Dict with keys:
                 status: "success" or "error"
                 data: Updated user data dict or error message
         """
-        session = self.Session()
         try:
             # Verify required field
-            if 'google_id' not in user_info:
-                return {"status": "error", "data": "Google ID is required"}
-            
-            # Get existing user
-            user = session.query(User).filter_by(google_id=user_info['google_id']).first()
-            if not user:
-                return {"status": "error", "data": "User not found"}
-            
-            # Update fields if provided
-            if 'name' in user_info:
-                user.name = user_info['name']
-            if 'team_id' in user_info:
-                user.team_id = user_info['team_id']
-            if 'access' in user_info:
-                user.access = user_info['access']
-                
-            session.commit()
-            
-            # Return updated user data
-            return {"status": "success", "data": {
-                "google_id": user.google_id,
-                "name": user.name,
-                "email":user.email,
-                "access": user.access,
-                "team_id": user.team_id
-            }}
-            
+            if 'google_id' in user_info:
+                where = User.google_id == user_info['google_id']
+            elif 'email' in user_info:
+                where = User.email == user_info['email']
+            else:
+                return {"status": "error", "data": "Google ID or email is required"}
+
+            values = {field: user_info[field] for field in ('name', 'team_id', 'access') if field in user_info}
+            changes_claims = 'team_id' in values or 'access' in values
+            if changes_claims:
+                # Invalidates session claims issued for the old access/team. SET
+                # expressions see the row before the update, so this only counts
+                # real changes.
+                changed = or_(*[self.FIELDS[field].is_distinct_from(values[field])
+                                for field in ('team_id', 'access') if field in values])
+                values['auth_epoch'] = User.auth_epoch + case((changed, 1), else_=0)
+
+            def update_user(session):
+                user = self.update_returning(session, where, values,
+                                             ('google_id', 'name', 'email', 'access', 'team_id', 'auth_epoch'))
+                if not user:
+                    return {"status": "error", "data": "User not found"}
+                return {"status": "success", "data": user}
+
+            return self.run_write(update_user)
+
         except Exception as e:
-            session.rollback()
             return {"status": "error", "data": str(e)}
-        finally:
-            session.close()
 
-    
+
     def exists(self, email: str=None, google_id: str=None) -> Dict:
         """Check if a user exists by Google ID.
-        
+
         Args:
             google_id: The Google ID to check
-            
+
         Returns:
             bool: True if user exists, False otherwise
         """
-        if google_id:
-            session = self.Session()
-            try:
-                exists = session.query(User).filter_by(email=email).first() is not None
-                return {"status":"success", "data":exists}
-            except Exception as e:
-                return {"status":"error", "data":str(e)}
-            finally:
-                session.close()
-        elif email:
-            
-            try:
-                session = self.Session()
-                try:
-                    exists = session.query(User).filter_by(email=email).first() is not None
-                    return {"status": "success", "data": exists}
-                finally:
-                    session.close()
-            except Exception as e:
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
-        else:
+        if not google_id and not email:
             return {"status": "error", "data": "Email or google id is required"}
+        try:
+            criterion = User.google_id == google_id if google_id else User.email == email
+            with self.session_scope() as session:
+                exists = session.execute(select(User.google_id).where(criterion).limit(1)).first() is not None
+                return {"status": "success", "data": exists}
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
 
 
     def create(self, user_info: Dict) -> Dict:
         """Create a new user in the database using Google OAuth information.
-        
+
         Args:
             user_info: Dictionary containing:
                 google_id: User's Google ID
@@ -177,30 +167,29 @@ class UserModel:
                 email: User's email address
                 access: Access level (optional, defaults to 1)
                 team_id: ID of the team (optional)
-                
+
         Returns:
             Dict with keys:
                 status: "success" or "error"
                 data: User data dict or error message
         """
-        try:            
+        try:
             if 'google_id' not in user_info or 'email' not in user_info:
                 return {"status": "error", "data": "Google ID and email are required"}
               # Check if user already exists
             exists_by_id = self.exists(google_id=user_info['google_id'])
             exists_by_email = self.exists(email=user_info["email"])
-            
-            if ((exists_by_id["status"] == "success" and exists_by_id["data"]) or 
+
+            if ((exists_by_id["status"] == "success" and exists_by_id["data"]) or
                 (exists_by_email["status"] == "success" and exists_by_email["data"])):
                 # User exists, update instead
                 return self.update(user_info)
-            
+
             # Default access level to 1 if not provided
             access = user_info.get('access', 1)
-            
+
             # Create new user
-            session = self.Session()
-            try:
+            def create_user(session):
                 new_user = User(
                     google_id=user_info['google_id'],
                     name=user_info['name'],
@@ -209,68 +198,97 @@ class UserModel:
                     team_id=user_info.get('team_id')
                 )
                 session.add(new_user)
-                session.commit()
-                
+                session.flush()
+
                 return {"status": "success", "data": {
                     "google_id": new_user.google_id,
                     "name": new_user.name,
                     "email": new_user.email,
                     "access": new_user.access,
-                    "team_id": new_user.team_id
+                    "team_id": new_user.team_id,
+                    "auth_epoch": new_user.auth_epoch
                 }}
-            except Exception as e:
-                session.rollback()
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
+
+            return self.run_write(create_user)
         except Exception as e:
             return {"status": "error", "data": str(e)}
-    
-    def get(self, email: str=None, google_id: str=None) -> Dict:
+
+    def upsert(self, user_info: Dict) -> Dict:
+        """Create a user, or refresh an existing one, in a single statement.
+
+        Used by the login callback. A new user gets the given team and access;
+        an existing user (matched by email) only has google_id and name
+        refreshed, keeping their team and access.
+
+        Args:
+            user_info: Dictionary containing:
+                google_id: User's Google ID
+                name: User's full name
+                email: User's email address
+                access: Access level for a new user (optional, defaults to 2)
+                team_id: Team of a new user (optional, defaults to 2)
+
+        Returns:
+            Dict with keys:
+                status: "success" or "error"
+                data: User data dict including team_name, or error message
+        """
+        try:
+            if 'google_id' not in user_info or 'email' not in user_info:
+                return {"status": "error", "data": "Google ID and email are required"}
+
+            # Must refer to the upserted row. SQLAlchemy does not correlate subqueries
+            # in INSERT ... RETURNING, so User.team_id would add its own users table
+            # to the FROM and return an arbitrary user's team; the literal column
+            # leaves the reference to SQLite, which resolves it to the returned row.
+            team_name = select(Team.name).where(
+                Team.id == literal_column(f"{User.__tablename__}.team_id")
+            ).scalar_subquery()
+            stmt = insert(User).values(
+                google_id=user_info['google_id'],
+                name=user_info.get('name', user_info['email']),
+                email=user_info['email'],
+                access=user_info.get('access', 2),
+                team_id=user_info.get('team_id', 2),
+                auth_epoch=0
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.email],
+                set_={'google_id': stmt.excluded.google_id, 'name': stmt.excluded.name}
+            ).returning(
+                User.google_id, User.name, User.email, User.access, User.team_id,
+                team_name.label('team_name'), User.auth_epoch
+            )
+
+            def upsert_user(session):
+                row = session.execute(stmt).mappings().one()
+                return {"status": "success", "data": dict(row)}
+
+            return self.run_write(upsert_user)
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
+
+    def get(self, email: str=None, google_id: str=None, fields: Optional[Sequence[str]] = None) -> Dict:
         """Get a user by Google ID.
-        
+
         Args:
             google_id: The Google ID of the user to retrieve
-            
+            fields: Only select these fields (see FIELDS)
+
         Returns:
             Dict with keys:
                 status: "success" or "error"
                 data: User data dict or error message
         """
-        if google_id!=None:
-            session = self.Session()
-            try:
-                user = session.query(User).options(joinedload(User.team)).filter_by(google_id=google_id).first()
-                if user:
-                    return {"status": "success", "data": {
-                        "google_id": user.google_id,
-                        "name": user.name,
-                        "email": user.email,
-                        "access": user.access,
-                        "team_id": user.team_id
-                    }}
-                
+        if google_id is None and email is None:
+            return {"status": "error", "data": "Email or google id is required"}
+        try:
+            criterion = User.google_id == google_id if google_id is not None else User.email == email
+            with self.session_scope() as session:
+                statement, serialize = self.reader(fields or self.DEFAULT_FIELDS)
+                row = session.execute(statement.where(criterion)).first()
+                if row:
+                    return {"status": "success", "data": serialize(row)}
                 return {"status": "error", "data": "User not found"}
-            except Exception as e:
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
-
-        elif email !=None:
-            session = self.Session()
-            try:
-                user = session.query(User).filter_by(email=email).first()
-                if user:
-                    return {"status": "success", "data": {
-                        "google_id": user.google_id,
-                        "name": user.name,
-                        "email": user.email,
-                        "access": user.access,
-                        "team_id": user.team_id
-                    }}
-                return {"status": "error", "data": f"User not found"}
-            except Exception as e:
-                return {"status": "error", "data": str(e)}
-            finally:
-                session.close()
-                
\ No newline at end of file
+        except Exception as e:
+            return {"status": "error", "data": str(e)}
@@ -0,0 +1,142 @@
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+# SQLite result codes for a database held by another connection
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+class WriteQueueFull(Exception):
+    """Raised when too many writers are already waiting for the database"""
+
+    def __init__(self, message: str = "The database is busy, please try again"):
+        super().__init__(message)
+
+
+def is_busy_error(error: Exception) -> bool:
+    """Check if an error is a transient 'database is locked' / SQLITE_BUSY failure"""
+    orig = getattr(error, 'orig', error)
+    if not isinstance(orig, sqlite3.OperationalError):
+        return False
+    code = getattr(orig, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(orig).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+class SerializedWriter:
+    """
+    SerializedWriter - Lets one writer at a time into the database per worker process
+
+    Writers wait in a bounded queue for the single writer slot instead of piling
+    up on SQLite's file lock. A write that still hits SQLITE_BUSY (another worker
+    process holds the lock) is retried with jittered exponential backoff.
+    """
+
+    def __init__(self, max_queue: int, queue_timeout: float, max_retries: int,
+                 base_delay_ms: float, max_delay_ms: float):
+        """Initialize the writer.
+
+        Args:
+            max_queue: Writers allowed to wait for the slot before new ones are rejected
+            queue_timeout: Seconds a writer waits for the slot before giving up
+            max_retries: Retries of a write that failed with SQLITE_BUSY
+            base_delay_ms: Backoff before the first retry, doubled for each later one
+            max_delay_ms: Upper bound for the backoff
+        """
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.base_delay_ms = base_delay_ms
+        self.max_delay_ms = max_delay_ms
+
+        self._slot = threading.RLock()
+        self._state = threading.Lock()
+        self._stats = {
+            'queue_depth': 0,
+            'max_queue_depth': 0,
+            'writes': 0,
+            'retries': 0,
+            'busy_failures': 0,
+            'rejected': 0,
+        }
+
+    def acquire(self) -> None:
+        """Wait for the writer slot.
+
+        Raises:
+            WriteQueueFull: If the queue is already full or the wait times out
+        """
+        with self._state:
+            if self._stats['queue_depth'] >= self.max_queue:
+                self._stats['rejected'] += 1
+                raise WriteQueueFull()
+            self._stats['queue_depth'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._stats['queue_depth'])
+
+        try:
+            acquired = self._slot.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._state:
+                self._stats['queue_depth'] -= 1
+
+        if not acquired:
+            with self._state:
+                self._stats['rejected'] += 1
+            raise WriteQueueFull()
+
+    def release(self) -> None:
+        """Give the writer slot to the next waiting writer"""
+        self._slot.release()
+
+    @contextmanager
+    def slot(self):
+        """Hold the writer slot for the duration of a block"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to sleep before retry number attempt (starting at 0), with jitter"""
+        delay_ms = min(self.max_delay_ms, self.base_delay_ms * (2 ** attempt))
+        return delay_ms * random.uniform(0.5, 1.5) / 1000
+
+    def run(self, operation: Callable, retry: bool = True):
+        """Run a write, retrying it while it fails with SQLITE_BUSY.
+
+        The caller must already hold the writer slot.
+
+        Args:
+            operation: Callable performing the whole write, safe to run again
+            retry: Set to False when the write cannot be repeated safely
+        """
+        attempt = 0
+        while True:
+            try:
+                result = operation()
+                with self._state:
+                    self._stats['writes'] += 1
+                return result
+            except Exception as e:
+                if not is_busy_error(e):
+                    raise
+                if not retry or attempt >= self.max_retries:
+                    with self._state:
+                        self._stats['busy_failures'] += 1
+                    raise
+                with self._state:
+                    self._stats['retries'] += 1
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+
+    def stats(self) -> Dict:
+        """Queue depth, retry and failure counters for this worker"""
+        with self._state:
+            return dict(self._stats)
@@ -1,9 +1,8 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
 import os
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from models.database import Base
+from models.db_runtime import get_runtime
+from models import unit_of_work
 from config.keys import Keys
 
 # Set environment variable to allow OAuth over HTTP for localhost development
@@ -24,6 +23,7 @@ from controllers.unit_Controller import UnitController
 from controllers.lesson_Controller import LessonController
 from controllers.lesson_component_Controller import LessonComponentController
 from controllers.auth_controller import AuthController
+from controllers.base_controller import BaseController
 
 from controllers.session_controller import SessionController
 
@@ -68,16 +68,16 @@ def init_database():
     db_path = os.path.abspath(os.path.join('data', 'robosite.db'))
     db_url = f'sqlite:///{db_path}'
 
-    # Create a single engine and create tables once
-    engine = create_engine(db_url, echo=False)
-    Base.metadata.create_all(engine)
+    # Create the process-wide runtime (one engine, one pool, one schema check)
+    runtime = get_runtime(db_url)
 
-    # Initialize all models with the same engine
-    user_model.initialize_DB(DB_name=db_url)
-    team_model.initialize_DB(DB_name=db_url)
-    unit_model.initialize_DB(DB_name=db_url)
-    lesson_model.initialize_DB(DB_name=db_url)
-    lesson_component_model.initialize_DB(DB_name=db_url)
+    # Initialize all models with the same runtime
+    user_model.initialize_DB(runtime=runtime)
+    team_model.initialize_DB(runtime=runtime)
+    unit_model.initialize_DB(runtime=runtime)
+    lesson_model.initialize_DB(runtime=runtime)
+    lesson_component_model.initialize_DB(runtime=runtime)
+    print(f"Database runtime: {runtime.describe()}")
     
     # Create default teams if they don't exist
     # default_teams = ["phoenixes", "pigeons", "teachers"]
@@ -164,6 +164,14 @@ def settings():
     """Logout"""
     return render_template("settings.html")
 
+@app.route('/admin/metrics')
+def metrics():
+    """Database and cache statistics for this worker (per-endpoint SQL counts and time, cache hits)"""
+    metrics = user_model.runtime.metrics()
+    metrics['page_cache'] = BaseController.page_cache.stats()
+    metrics['fragments'] = BaseController.fragments.stats()
+    return jsonify(metrics)
+
 # Routes using add_url_rule for cleaner organization
 
 # Team routes
@@ -195,41 +203,80 @@ app.add_url_rule('/lesson_components/create', 'lesson_components.create', view_f
 app.add_url_rule('/lesson_components/update', 'lesson_components.update', view_func=lesson_component_controller.update, methods=['POST'])
 app.add_url_rule('/lesson_components/delete', 'lesson_components.delete', view_func=lesson_component_controller.delete, methods=['POST'])
 
+# Access Control
+# Required access level per endpoint (1=guest, 2=member, 3=admin), filled in
+# once at registration time. Endpoints without an entry (static files, the home
+# page, OAuth) are public and never load the user.
+MEMBER_ACCESS = 2
+ADMIN_ACCESS = 3
+endpoint_access = {}
+access_denied = {
+    MEMBER_ACCESS: ('You must be a team member to access this page', 'message'),
+    ADMIN_ACCESS: ('You must be a team captain or teacher to perform this action', 'error'),
+}
+
+def require_access(level, *endpoints):
+    """Register the access level required for already registered endpoints"""
+    for endpoint in endpoints:
+        if endpoint not in app.view_functions:
+            raise ValueError(f"Unknown endpoint '{endpoint}'")
+        endpoint_access[endpoint] = level
+
+require_access(MEMBER_ACCESS, 'units.view', 'teams.view', 'lessons.view', 'lesson_components.view')
+require_access(ADMIN_ACCESS,
+    'metrics',
+    'teams.create', 'teams.update',
+    'users.update', 'users.delete',
+    'units.create', 'units.update', 'units.delete',
+    'lessons.create', 'lessons.update', 'lessons.delete',
+    'lesson_components.create', 'lesson_components.update', 'lesson_components.delete'
+)
+
 # Access Control Middleware
 @app.before_request
 def check_access():
     """Check if user has required access level for protected routes"""
-    user = auth_controller.get_current_user()
-    
-    # Public routes
-    public_routes = ['index', 'google_login', 'callback']
-    if request.endpoint in public_routes:
+    required = endpoint_access.get(request.endpoint)
+    if required is None:
         return None
-    
-    # Member routes (level 2+)
-    member_routes = ['units.view', 'teams.view', 'lessons.view', 'lesson_components.view']
-    if request.endpoint in member_routes and user['access'] < 2:
-        flash('You must be a team member to access this page')
-        return redirect(url_for('index'))
-    
-    # Admin routes (level 3)
-    admin_routes = [
-        'teams.create', 'teams.update', 
-        'users.update', 'users.delete',
-        'units.create', 'units.update', 'units.delete',
-        'lessons.create', 'lessons.update', 'lessons.delete',
-        'lesson_components.create', 'lesson_components.update', 'lesson_components.delete'
-    ]
-    if request.endpoint in admin_routes and user['access'] < 3:
-        flash('You must be a team captain or teacher to perform this action', 'error')
+
+    user = auth_controller.get_current_user()
+    if user['access'] < required:
+        message, category = access_denied[required]
+        flash(message, category)
         return redirect(url_for('index'))
-    
+
     return None
 
 @app.before_request
 def make_session_permanent():
     session.permanent = True
 
+# Read-only views run on the read-only connection pool, never on the writer
+unit_of_work.mark_read_only('units.view', 'lessons.view', 'lesson_components.view', 'teams.view')
+
+# One database transaction per request: models join it, it is committed
+# before the response is sent and closed in the teardown
+@app.after_request
+def commit_db_session(response):
+    """Commit the request's database session, replacing the response if that fails"""
+    try:
+        unit_of_work.commit()
+    except Exception as e:
+        print(f"Error committing request transaction: {str(e)}")
+        # The view's own messages describe changes that were just rolled back
+        session.pop('_flashes', None)
+        flash("Your changes could not be saved, please try again", 'error')
+        if response.status_code in (301, 302, 303, 307, 308):
+            return response
+        return app.response_class("Your changes could not be saved, please try again", status=503)
+    return response
+
+@app.teardown_request
+def finish_db_session(exception=None):
+    """Roll back anything the request did not commit and close its session"""
+    unit_of_work.finish(exception)
+
 if __name__ == '__main__':
     # Initialize databases
     init_database()
@@ -0,0 +1,49 @@
+"""Test the access control middleware."""
+import pytest
+import sys
+import os
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from flask import g
+import server
+
+@pytest.fixture(scope="function")
+def client(monkeypatch):
+    """A test client whose user lookups are recorded"""
+    lookups = []
+    monkeypatch.setattr(server.auth_controller, 'get_current_user',
+                        lambda: lookups.append(1) or {'access': 1})
+    server.app.config['TESTING'] = True
+    with server.app.test_client() as client:
+        client.lookups = lookups
+        yield client
+
+def test_every_protected_endpoint_is_registered():
+    """Test the access table only names real endpoints"""
+    assert set(server.endpoint_access) <= set(server.app.view_functions)
+    assert server.endpoint_access['units.view'] == server.MEMBER_ACCESS
+    assert server.endpoint_access['units.create'] == server.ADMIN_ACCESS
+    assert 'static' not in server.endpoint_access
+
+def test_unknown_endpoint_rejected():
+    """Test registering a typo fails loudly"""
+    with pytest.raises(ValueError):
+        server.require_access(server.ADMIN_ACCESS, 'units.craete')
+
+def test_static_files_skip_user_lookup(client):
+    """Test static files are served without loading the user"""
+    response = client.get('/static/css/styles.css')
+    assert response.status_code == 200
+    assert client.lookups == []
+
+def test_member_route_checks_access(client):
+    """Test guests are redirected away from member pages"""
+    response = client.get('/units')
+    assert response.status_code == 302
+    assert client.lookups == [1]
+
+def test_admin_route_checks_access(client):
+    """Test guests cannot reach admin actions"""
+    response = client.post('/units/create', data={'unit_name': 'Nope'})
+    assert response.status_code == 302
+    assert client.lookups == [1]
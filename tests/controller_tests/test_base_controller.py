@@ -0,0 +1,165 @@
+"""Test the base Controller."""
+import pytest
+import sys
+import os
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from flask import Flask, session
+from controllers.base_controller import BaseController
+from models.db_runtime import DatabaseRuntime
+from models.user_model import UserModel
+
+@pytest.fixture(scope="function")
+def user_model(tmp_path):
+    """A user model with one member, counting its lookups"""
+    model = UserModel()
+    model.initialize_DB(runtime=DatabaseRuntime(str(tmp_path / "base_controller_test.db")))
+    model.create({'google_id': 'g1', 'name': 'Member', 'email': 'member@example.com', 'access': 2})
+    model.lookups = 0
+    get = model.get
+
+    def counting_get(*args, **kwargs):
+        model.lookups += 1
+        return get(*args, **kwargs)
+
+    model.get = counting_get
+    return model
+
+@pytest.fixture(scope="function")
+def app():
+    """A bare Flask app with a session secret"""
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    return app
+
+def test_current_user_looked_up_once_per_request(app, user_model):
+    """Test repeated get_current_user calls share one database lookup"""
+    controller = BaseController(user_model)
+    other_controller = BaseController(user_model)
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        assert controller.get_current_user()['access'] == 2
+        assert controller.require_access_level(2)
+        assert other_controller.get_current_user()['email'] == 'member@example.com'
+        assert user_model.lookups == 1
+
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        controller.get_current_user()
+        assert user_model.lookups == 2
+
+def test_forget_current_user(app, user_model):
+    """Test the cached user is dropped after logout"""
+    controller = BaseController(user_model)
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        assert controller.get_current_user()['access'] == 2
+        session.clear()
+        controller.forget_current_user()
+        assert controller.get_current_user()['name'] == 'guest'
+
+def test_fresh_claims_skip_database(app, user_model):
+    """Test signed session claims are trusted without a full user lookup until the TTL"""
+    controller = BaseController(user_model)
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        controller.get_current_user()
+        cookie = dict(session)
+    assert user_model.lookups == 1
+
+    with app.test_request_context('/'):
+        session.update(cookie)
+        user = controller.get_current_user()
+        assert user['access'] == 2
+        assert user['email'] == 'member@example.com'
+    assert user_model.lookups == 1
+
+def test_stale_claims_are_revalidated(app, user_model, monkeypatch):
+    """Test claims older than the TTL are checked against the database"""
+    controller = BaseController(user_model)
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        controller.get_current_user()
+        cookie = dict(session)
+
+    monkeypatch.setattr(controller.session_claims, 'ttl', 0)
+    with app.test_request_context('/'):
+        session.update(cookie)
+        controller.get_current_user()
+    assert user_model.lookups == 2
+
+def test_access_change_revokes_claims(app, user_model):
+    """Test UserModel.update bumps the auth epoch and claims are revalidated"""
+    controller = BaseController(user_model)
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        assert controller.get_current_user()['auth_epoch'] == 0
+        cookie = dict(session)
+
+    result = user_model.update({'google_id': 'g1', 'access': 3})
+    assert result['data']['auth_epoch'] == 1
+
+    with app.test_request_context('/'):
+        session.update(cookie)
+        user = controller.get_current_user()
+        assert user['access'] == 3
+        assert user['auth_epoch'] == 1
+    assert user_model.lookups == 2
+
+def test_claims_rejected_after_change_in_another_process(app, user_model, tmp_path):
+    """Test a demotion or removal made through another connection pool is seen at once"""
+    controller = BaseController(user_model)
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        controller.get_current_user()
+        cookie = dict(session)
+
+    # Another worker process has its own runtime, engine and connections
+    other_worker = UserModel()
+    other_worker.initialize_DB(runtime=DatabaseRuntime(str(tmp_path / "base_controller_test.db")))
+    other_worker.update({'google_id': 'g1', 'access': 1})
+
+    with app.test_request_context('/'):
+        session.update(cookie)
+        assert controller.get_current_user()['access'] == 1
+    assert user_model.lookups == 2
+
+    other_worker.remove('g1')
+    with app.test_request_context('/'):
+        session.update(cookie)
+        assert controller.get_current_user()['name'] == 'guest'
+
+def test_forged_claims_are_ignored(app, user_model):
+    """Test claims that fail the signature check fall back to the database"""
+    controller = BaseController(user_model)
+    with app.test_request_context('/'):
+        session['user'] = {'email': 'member@example.com'}
+        session['claims'] = controller.session_claims.issue({'google_id': 'g1', 'access': 3})[:-2] + 'xx'
+        assert controller.get_current_user()['access'] == 2
+    assert user_model.lookups == 1
+
+def test_conditional_page(app, user_model):
+    """Test a matching If-None-Match is answered with 304 before the page is rendered"""
+    controller = BaseController(user_model)
+    member = {'email': 'member@example.com', 'access': 2, 'team_id': 1}
+    version = {'status': 'success', 'data': {'version': '1|x', 'updated_at': None}}
+    renders = []
+
+    def render():
+        renders.append(1)
+        return 'page'
+
+    with app.test_request_context('/'):
+        first = controller.conditional_page(version, member, render)
+    etag = first.get_etag()[0]
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'private, no-cache'
+
+    with app.test_request_context('/', headers={'If-None-Match': f'"{etag}"'}):
+        assert controller.conditional_page(version, member, render).status_code == 304
+        other_user = dict(member, email='other@example.com')
+        assert controller.conditional_page(version, other_user, render).status_code == 200
+        newer = {'status': 'success', 'data': {'version': '2|x', 'updated_at': None}}
+        assert controller.conditional_page(newer, member, render).status_code == 200
+        session['_flashes'] = [('success', 'Saved')]
+        assert controller.conditional_page(version, member, render) == 'page'
+    assert len(renders) == 4
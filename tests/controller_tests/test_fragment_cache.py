@@ -0,0 +1,33 @@
+"""Test the template fragment cache."""
+import pytest
+import sys
+import os
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from markupsafe import Markup
+from controllers.fragment_cache import FragmentCache
+
+def test_fragment_rendered_once_per_key():
+    """Test a fragment is rendered once and then served as safe markup"""
+    cache = FragmentCache()
+    renders = []
+
+    def render():
+        renders.append(1)
+        return '<nav>Intro</nav>'
+
+    first = cache.get(('lesson_sidebar', 1, 'v1', 'student', None), render)
+    second = cache.get(('lesson_sidebar', 1, 'v1', 'student', None), render)
+    cache.get(('lesson_sidebar', 1, 'v2', 'student', None), render)
+
+    assert first is second and isinstance(first, Markup)
+    assert len(renders) == 2
+    assert cache.stats() == {'entries': 2, 'hits': 1, 'misses': 2}
+
+def test_oldest_fragment_evicted():
+    """Test the cache stays within max_entries"""
+    cache = FragmentCache(max_entries=2)
+    for version in ('v1', 'v2', 'v3'):
+        cache.get(('lesson_sidebar', 1, version), lambda: version)
+
+    assert list(cache.entries) == [('lesson_sidebar', 1, 'v2'), ('lesson_sidebar', 1, 'v3')]
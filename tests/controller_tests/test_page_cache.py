@@ -0,0 +1,53 @@
+"""Test the full-page response cache."""
+import pytest
+import sys
+import os
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from controllers import page_cache as page_cache_module
+from controllers.page_cache import PageCache
+
+KEY = ('units.view', (), 2, 1, 'v1')
+
+def page_for(email):
+    """A rendered page showing the viewer's email in the navbar"""
+    return f'<nav>{email}</nav><main>Units</main>'
+
+def test_page_shared_between_viewers():
+    """Test one rendered page serves every viewer with the same key, under their own email"""
+    cache = PageCache(enabled=True)
+    assert cache.get(KEY, 'a@example.com', lambda: page_for('a@example.com')) == page_for('a@example.com')
+    assert cache.get(KEY, 'b@example.com', lambda: 'not rendered') == page_for('b@example.com')
+    assert cache.stats() == {'enabled': True, 'entries': 1, 'hits': 1, 'misses': 1}
+
+def test_email_is_escaped_like_the_template():
+    """Test emails with HTML special characters are found and put back escaped"""
+    cache = PageCache(enabled=True)
+    cache.get(KEY, "o'neil@example.com", lambda: page_for('o&#39;neil@example.com'))
+    assert cache.get(KEY, 'b<c@example.com', lambda: '') == page_for('b&lt;c@example.com')
+
+def test_disabled_and_redirects_pass_through():
+    """Test nothing is cached when disabled, or when the view does not return HTML"""
+    assert PageCache(enabled=False).get(KEY, 'a@example.com', lambda: 'page') == 'page'
+    cache = PageCache(enabled=True)
+    redirect = object()
+    assert cache.get(KEY, 'a@example.com', lambda: redirect) is redirect
+    assert cache.stats()['entries'] == 0
+
+def test_expired_page_rendered_again(monkeypatch):
+    """Test pages are rendered again once older than the TTL"""
+    now = [100.0]
+    monkeypatch.setattr(page_cache_module.time, 'monotonic', lambda: now[0])
+    cache = PageCache(enabled=True, ttl=60)
+    cache.get(KEY, 'a@example.com', lambda: 'old')
+    now[0] += 61
+    assert cache.get(KEY, 'a@example.com', lambda: 'new') == 'new'
+
+def test_least_recently_used_evicted():
+    """Test the cache keeps the most recently used pages"""
+    cache = PageCache(enabled=True, max_entries=2)
+    for key in ('a', 'b'):
+        cache.get(key, 'a@example.com', lambda: key)
+    cache.get('a', 'a@example.com', lambda: '')
+    cache.get('c', 'a@example.com', lambda: 'c')
+    assert list(cache.entries) == ['a', 'c']
@@ -0,0 +1,74 @@
+import pytest
+import os
+import sys
+import json
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from models import component_content
+from models.component_content import ContentViews, parse_content
+from models.db_runtime import DatabaseRuntime
+from models.lesson_component_model import LessonComponentModel
+from test_data.sample_lesson_component_data import SAMPLE_LESSON_COMPONENTS
+
+@pytest.fixture(scope="function")
+def component(tmp_path):
+    """A lesson component model on an empty database"""
+    model = LessonComponentModel()
+    model.initialize_DB(runtime=DatabaseRuntime(str(tmp_path / "content_test.db")))
+    return model
+
+def test_sample_content_is_valid():
+    """Test every sample component fits its type's schema"""
+    for sample in SAMPLE_LESSON_COMPONENTS:
+        assert parse_content(sample["type"], sample["content"]) == json.loads(sample["content"])
+
+def test_plain_html_wrapped():
+    """Test text and exercise content may be plain HTML"""
+    assert parse_content(1, "<p>Hello</p>") == {"text": "<p>Hello</p>"}
+    assert parse_content("4", "<p>Build it</p>") == {"instructions": "<p>Build it</p>"}
+    assert parse_content(1, None) == {}
+
+@pytest.mark.parametrize("content", ["2024", "null", "[1]", '"hi"'])
+def test_plain_text_that_parses_as_json_wrapped(content):
+    """Test text and exercise content is kept as text when it is JSON but not an object"""
+    assert parse_content(1, content) == {"text": content}
+    assert parse_content(4, content) == {"instructions": content}
+
+@pytest.mark.parametrize("component_type, content, message", [
+    (2, "{}", "url"),
+    (2, "https://example.com/v", "not valid JSON"),
+    (3, '{"questions": [{"q": "Why?", "options": []}]}', "options"),
+    (3, '{"questions": [{"q": "Why?", "options": ["A"], "correct": 2}]}', "no option 2"),
+    (5, '{"simulator_config": 1}', "simulator_config"),
+    (3, '["text"]', "JSON object"),
+    (9, "{}", "Unknown component type"),
+])
+def test_invalid_content_rejected(component_type, content, message):
+    """Test content that does not fit its type is rejected with the reason"""
+    with pytest.raises(ValueError, match=message):
+        parse_content(component_type, content)
+
+def test_create_and_update_validate(component):
+    """Test writes store validated, compact JSON and reject content that does not fit"""
+    created = component.create({"name": "Video", "lesson_id": 1, "type": "2",
+                                "content": '{ "url": "https://example.com/v" }'})
+    assert created["data"]["content"] == '{"url":"https://example.com/v"}'
+    assert created["data"]["type"] == 2
+
+    assert "url" in component.create({"name": "Bad", "lesson_id": 1, "type": 2, "content": "{}"})["data"]
+    assert component.update({"id": created["data"]["id"], "content": '{"text": "x"}'})["status"] == "error"
+    assert component.update({"id": created["data"]["id"], "type": 1})["status"] == "success"
+
+def test_views_decoded_once_per_content(monkeypatch):
+    """Test a component's content is only decoded again when it changes"""
+    views = ContentViews()
+    decodes = []
+    parse = component_content.parse_content
+    monkeypatch.setattr(component_content, "parse_content", lambda *args: decodes.append(1) or parse(*args))
+
+    first = views.get(1, 2, '{"url":"a"}')
+    assert views.get(1, 2, '{"url":"a"}') is first
+    assert views.get(1, 2, '{"url":"b"}') == {"url": "b"}
+    assert views.get(2, 2, "not json") == {}
+    assert views.get(3, 1, "2024") == {"text": "2024"}
+    assert len(decodes) == 4
@@ -0,0 +1,83 @@
+import pytest
+import os
+import sys
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from sqlalchemy import inspect
+from models.db_runtime import DatabaseRuntime, get_runtime, resolve_url
+from models.unit_model import UnitModel
+from models.lesson_model import LessonModel
+
+@pytest.fixture(scope="function")
+def db_file(tmp_path):
+    """Path to a fresh database file for each test"""
+    return str(tmp_path / "runtime_test.db")
+
+def test_resolve_url():
+    """Test resolving file names and URLs"""
+    assert resolve_url("sqlite:///:memory:") == "sqlite:///:memory:"
+    assert resolve_url("/tmp/robosite/test").endswith("/tmp/robosite/test.db")
+
+def test_runtime_creates_tables(db_file):
+    """Test the runtime creates the schema once"""
+    runtime = DatabaseRuntime(db_file)
+    tables = inspect(runtime.engine).get_table_names()
+    assert {"users", "teams", "units", "lessons", "lesson_components"} <= set(tables)
+
+def test_runtime_pool_sizing(db_file):
+    """Test the pool honours the configured size"""
+    runtime = DatabaseRuntime(db_file, pool_size=1, max_overflow=0)
+    assert runtime.engine.pool.size() == 1
+    assert runtime.describe()["max_overflow"] == 0
+
+def test_models_share_runtime(db_file):
+    """Test models initialized with the same database share one engine"""
+    unit = UnitModel()
+    lesson = LessonModel()
+    unit.initialize_DB(db_file)
+    lesson.initialize_DB(db_file)
+
+    assert unit.runtime is get_runtime(db_file)
+    assert unit.engine is lesson.engine
+    assert unit.Session is lesson.Session
+
+def test_models_accept_injected_runtime(db_file):
+    """Test a runtime can be injected directly"""
+    runtime = DatabaseRuntime(db_file)
+    unit = UnitModel()
+    unit.initialize_DB(runtime=runtime)
+
+    result = unit.create("Injected Unit")
+    assert result["status"] == "success"
+    assert unit.get(id=result["data"]["id"])["data"]["name"] == "Injected Unit"
+
+def test_runtime_applies_pragma_profile(db_file):
+    """Test the performance profile is applied to new connections"""
+    runtime = DatabaseRuntime(db_file, pragma_profile="performance")
+    pragmas = runtime.active_pragmas()
+
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 5000
+    assert pragmas["temp_store"] == 2  # MEMORY
+
+def test_runtime_default_pragma_profile(db_file):
+    """Test the default profile leaves SQLite settings alone"""
+    runtime = DatabaseRuntime(db_file, pragma_profile="default")
+    assert runtime.active_pragmas()["journal_mode"] == "delete"
+
+def test_runtime_unknown_pragma_profile(db_file):
+    """Test an unknown profile name is rejected"""
+    with pytest.raises(ValueError):
+        DatabaseRuntime(db_file, pragma_profile="turbo")
+
+def test_runtime_reader_engine(db_file):
+    """Test a read-only engine is opened next to the writer"""
+    runtime = DatabaseRuntime(db_file)
+    assert "mode=ro" in str(runtime.reader_engine.url)
+    assert runtime.ReadSession is not runtime.Session
+
+def test_memory_runtime_shares_engine():
+    """Test in-memory databases read through the writer engine"""
+    runtime = DatabaseRuntime("sqlite:///:memory:")
+    assert runtime.reader_engine is runtime.engine
@@ -0,0 +1,118 @@
+import pytest
+import os
+import sys
+import sqlite3
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from flask import Flask
+from sqlalchemy import event
+from models import unit_of_work
+from models.db_runtime import DatabaseRuntime
+from models.lesson_component_model import LessonComponentModel
+from models.lesson_model import LessonModel
+from models.unit_model import UnitModel
+
+@pytest.fixture(scope="function")
+def runtime(tmp_path):
+    """A runtime with one unit and lesson"""
+    runtime = DatabaseRuntime(str(tmp_path / "cache_test.db"))
+    unit = UnitModel()
+    unit.initialize_DB(runtime=runtime)
+    unit.create("Basics")
+    lesson = LessonModel()
+    lesson.initialize_DB(runtime=runtime)
+    lesson.create({"name": "Intro", "type": 1, "img": "", "unit_id": 1})
+    return runtime
+
+def bind(model, runtime):
+    """Bind a new model instance to the runtime"""
+    model.initialize_DB(runtime=runtime)
+    return model
+
+def count_statements(runtime):
+    """Record every statement sent on the runtime's engine"""
+    statements = []
+    event.listen(runtime.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def test_repeat_read_served_from_cache(runtime):
+    """Test a repeated read only checks the generation"""
+    lesson = bind(LessonModel(), runtime)
+    first = lesson.get_by_unit_id(1)
+    statements = count_statements(runtime)
+
+    assert lesson.get_by_unit_id(1) == first
+    assert len(statements) == 1
+    assert "cache_generations" in statements[0]
+    assert lesson.curriculum_cache.stats()["hits"] == 1
+
+def test_write_from_another_model_invalidates(runtime):
+    """Test a component write drops the cached lessons and unit tree of other instances"""
+    lesson = bind(LessonModel(), runtime)
+    unit = bind(UnitModel(), runtime)
+    assert lesson.get_by_unit_id(1)["data"][0]["components"] == []
+    assert unit.get_curriculum_tree()["data"][0]["lessons"][0]["components"] == []
+
+    bind(LessonComponentModel(), runtime).create({"name": "Video", "type": 2, "content": "{\"url\": \"v\"}", "lesson_id": 1})
+
+    assert [c["name"] for c in lesson.get_by_unit_id(1)["data"][0]["components"]] == ["Video"]
+    assert [c["name"] for c in unit.get_curriculum_tree()["data"][0]["lessons"][0]["components"]] == ["Video"]
+
+def test_write_from_another_process_invalidates(runtime, tmp_path):
+    """Test a write on a separate connection, as another worker would make, is seen"""
+    unit = bind(UnitModel(), runtime)
+    assert [u["name"] for u in unit.get_all()["data"]] == ["Basics"]
+
+    conn = sqlite3.connect(str(tmp_path / "cache_test.db"))
+    conn.execute("INSERT INTO units (name) VALUES ('advanced')")
+    conn.commit()
+    conn.close()
+
+    assert [u["name"] for u in unit.get_all()["data"]] == ["Basics", "advanced"]
+    assert unit.curriculum_cache.stats()["misses"] == 2
+
+def test_uncommitted_reads_not_cached(runtime, tmp_path):
+    """Test a read after a write in the same request is not cached under the write's generation"""
+    unit = bind(UnitModel(), runtime)
+    assert [u["name"] for u in unit.get_all()["data"]] == ["Basics"]
+
+    with Flask(__name__).test_request_context('/', method='POST'):
+        unit.create("Rolled Back")
+        assert [u["name"] for u in unit.get_all()["data"]] == ["Basics", "Rolled Back"]
+        unit_of_work.finish(RuntimeError("request failed"))
+
+    # Another worker's write brings the counter to the generation the rolled back write saw
+    conn = sqlite3.connect(str(tmp_path / "cache_test.db"))
+    conn.execute("INSERT INTO units (name) VALUES ('advanced')")
+    conn.commit()
+    conn.close()
+
+    assert [u["name"] for u in unit.get_all()["data"]] == ["Basics", "advanced"]
+
+def test_errors_not_cached(runtime):
+    """Test a failed read is run again rather than served from the cache"""
+    unit = bind(UnitModel(), runtime)
+    assert unit.get_all(cursor="bogus")["status"] == "error"
+    assert unit.get_all(cursor="bogus")["status"] == "error"
+    assert unit.curriculum_cache.stats()["entries"] == 0
+
+def test_versions_follow_writes(runtime):
+    """Test the page versions change on every write beneath them"""
+    unit = bind(UnitModel(), runtime)
+    lesson = bind(LessonModel(), runtime)
+    component = bind(LessonComponentModel(), runtime)
+
+    def versions():
+        return (unit.get_curriculum_version()["data"]["version"], lesson.get_lesson_version(1)["data"]["version"])
+
+    empty = versions()
+    created = component.create({"name": "Video", "type": 2, "content": "{\"url\": \"v\"}", "lesson_id": 1})["data"]
+    with_video = versions()
+    component.update({"id": created["id"], "content": '{"url": "x"}'})
+    edited = versions()
+    component.remove(id=created["id"])
+
+    assert all(len(set(states)) == 3 for states in zip(empty, with_video, edited))
+    assert versions() == empty
+    assert lesson.get_lesson_version(1)["data"]["updated_at"] is not None
+    assert lesson.get_lesson_version(99)["status"] == "error"
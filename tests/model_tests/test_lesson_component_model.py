@@ -4,7 +4,7 @@ import json
 import sys
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, root_dir)
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from models.database import Base, Lesson, LessonComponent
 from models import lesson_component_model
@@ -221,4 +221,42 @@ def test_lesson_component_content_validation(lesson_component, setup_lesson_comp
     assert result["status"] == "success"
     loaded_content = json.loads(result["data"]["content"])
     assert isinstance(loaded_content, dict)
-    assert loaded_content["text"] == "Test content"
\ No newline at end of file
+    assert loaded_content["text"] == "Test content"
+
+def test_lesson_component_fields_projection(lesson_component, setup_lesson_component_data):
+    """Test fields= leaves out the component content"""
+    new_component = lesson_component.create({
+        "name": "Projected Component",
+        "lesson_id": 1,
+        "type": 1,
+        "content": json.dumps({"text": "Long body"})
+    })
+    component_id = new_component["data"]["id"]
+
+    result = lesson_component.get(id=component_id, fields=("id", "name"))
+    assert result["data"] == {"id": component_id, "name": "Projected Component"}
+
+    summaries = lesson_component.get_by_lesson_id(1, fields=("id", "type"))["data"]
+    assert {"id": component_id, "type": 1} in summaries
+    assert all("content" not in summary for summary in summaries)
+
+def test_lesson_component_partial_update(lesson_component, engine, setup_lesson_component_data):
+    """Test update writes only the given fields in a single statement"""
+    new_component = lesson_component.create({
+        "name": "Partial Component",
+        "lesson_id": 1,
+        "type": 2,
+        "content": json.dumps({"url": "https://example.com/kept"})
+    })
+    component_id = new_component["data"]["id"]
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    result = lesson_component.update({"id": component_id, "name": "Renamed Component"})
+
+    assert result["status"] == "success"
+    assert result["data"]["name"] == "Renamed Component"
+    assert result["data"]["type"] == 2
+    assert json.loads(result["data"]["content"]) == {"url": "https://example.com/kept"}
+    assert len(statements) == 1
+    assert "content=" not in statements[0].replace(" ", "")
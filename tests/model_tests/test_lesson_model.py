@@ -3,7 +3,7 @@ import os
 import sys
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, root_dir)
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from models.database import Base, Unit, Lesson, LessonComponent
 from models import lesson_model
@@ -193,6 +193,14 @@ def test_missing_required_fields(lesson, setup_lesson_data):
     assert result["status"] == "error"
     assert "required" in result["data"].lower()
 
+def test_create_requires_unit_id(lesson, setup_lesson_data):
+    """Test a lesson is not created without the unit it belongs to"""
+    result = lesson.create({"name": "Unitless Lesson"})
+
+    assert result["status"] == "error"
+    assert "unit_id" in result["data"]
+    assert lesson.exists(lesson="Unitless Lesson")["data"] is False
+
 def test_duplicate_lesson_name(lesson, setup_lesson_data):
     """Test creating a lesson with duplicate name"""
     # First create a lesson
@@ -208,4 +216,81 @@ def test_duplicate_lesson_name(lesson, setup_lesson_data):
     })
     
     assert result["status"] == "error"
-    assert "exists" in result["data"].lower()
\ No newline at end of file
+    assert "exists" in result["data"].lower()
+
+def test_lesson_fields_projection(lesson, engine, setup_lesson_data):
+    """Test fields= selects only the named columns and skips components"""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    first = SAMPLE_LESSONS[0]
+    result = lesson.get(id=first["id"], fields=("id", "name"))
+    assert result["status"] == "success"
+    assert result["data"] == {"id": first["id"], "name": first["name"]}
+    assert len(statements) == 1
+    assert "lesson_components" not in statements[0]
+
+    rows = lesson.get_all(fields=("unit_id",))["data"]
+    assert len(rows) == len(SAMPLE_LESSONS)
+    assert all(list(row) == ["unit_id"] for row in rows)
+
+def test_lesson_page(lesson, engine, session, setup_lesson_data):
+    """Test the lesson page loader returns everything in one query"""
+    first = SAMPLE_LESSONS[0]
+    session.add(LessonComponent(id=11, name="Intro Text", type=1, content="<p>Hello</p>", lesson_id=first["id"]))
+    session.add(LessonComponent(id=12, name="Intro Video", type=2, content='{"url": "x"}', lesson_id=first["id"]))
+    session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    result = lesson.get_lesson_page(first["id"], component_id=12)
+
+    assert result["status"] == "success"
+    assert len(statements) == 1
+    page = result["data"]
+    assert page["unit"] == {"id": first["unit_id"], "name": f"Unit {first['unit_id']}"}
+    assert page["lesson"]["name"] == first["name"]
+    assert page["components"] == [
+        {"id": 11, "name": "Intro Text", "type": 1},
+        {"id": 12, "name": "Intro Video", "type": 2}
+    ]
+    assert page["current_component"]["content"] == '{"url": "x"}'
+    assert page["current_component"]["view"] == {"url": "x"}
+
+    assert lesson.get_lesson_page(first["id"])["data"]["current_component"] is None
+    assert lesson.get_lesson_page(999)["status"] == "error"
+
+def test_remove_cascades(lesson, session, setup_lesson_data):
+    """Test removing a lesson deletes its components and reports the counts"""
+    first, second = SAMPLE_LESSONS[0], SAMPLE_LESSONS[1]
+    session.add(LessonComponent(id=11, name="Intro Text", type=1, content="{}", lesson_id=first["id"]))
+    session.add(LessonComponent(id=12, name="Intro Video", type=2, content="{}", lesson_id=first["id"]))
+    session.add(LessonComponent(id=13, name="Other Text", type=1, content="{}", lesson_id=second["id"]))
+    session.commit()
+
+    result = lesson.remove(id=first["id"])
+
+    assert result == {"status": "success", "data": {"lesson_components": 2, "lessons": 1}}
+    session.expire_all()
+    assert [c.id for c in session.query(LessonComponent).all()] == [13]
+    assert lesson.remove(id=first["id"])["data"] == "Lesson not found"
+
+def test_core_read_path(lesson, engine, session, setup_lesson_data):
+    """Test listings read rows with cached Core selects and nest components in one extra query"""
+    first = SAMPLE_LESSONS[0]
+    session.add(LessonComponent(id=21, name="Second", type=1, content="b", lesson_id=first["id"]))
+    session.add(LessonComponent(id=20, name="First", type=2, content="a", lesson_id=first["id"]))
+    session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    result = lesson.get_all()
+
+    assert result["status"] == "success"
+    assert len(statements) == 2
+    listed = next(row for row in result["data"] if row["id"] == first["id"])
+    assert listed["components"] == [
+        {"id": 20, "name": "First", "type": 2, "content": "a"},
+        {"id": 21, "name": "Second", "type": 1, "content": "b"},
+    ]
+    assert lesson.reader(("id", "name")) is lesson.reader(("id", "name"))
@@ -0,0 +1,111 @@
+import pytest
+import os
+import sys
+import sqlite3
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from models.db_runtime import DatabaseRuntime
+from models.migrations import MIGRATIONS, MigrationError
+from models.user_model import UserModel
+
+def test_new_database_records_all_migrations(tmp_path):
+    """Test a fresh database is marked as fully migrated"""
+    runtime = DatabaseRuntime(str(tmp_path / "fresh.db"))
+    assert runtime.migrations_applied == [name for name, step in MIGRATIONS]
+    assert DatabaseRuntime(str(tmp_path / "fresh.db")).migrations_applied == []
+
+def test_old_users_table_gets_auth_epoch(tmp_path):
+    """Test the auth_epoch column is added to a database created before it existed"""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE teams (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE)")
+    conn.execute("CREATE TABLE users (google_id VARCHAR PRIMARY KEY, name VARCHAR NOT NULL, "
+                 "email VARCHAR NOT NULL UNIQUE, access INTEGER, team_id INTEGER REFERENCES teams(id))")
+    conn.execute("INSERT INTO users VALUES ('g1', 'Old User', 'old@example.com', 2, NULL)")
+    conn.commit()
+    conn.close()
+
+    user_model = UserModel()
+    user_model.initialize_DB(runtime=DatabaseRuntime(path))
+    assert user_model.get(google_id='g1')['data']['auth_epoch'] == 0
+
+def create_old_curriculum(path, unit_names):
+    """Create units/lessons/lesson_components tables without unique name indexes"""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE units (id INTEGER PRIMARY KEY, name VARCHAR)")
+    conn.execute("CREATE TABLE lessons (id INTEGER PRIMARY KEY, name VARCHAR, type INTEGER, img VARCHAR, "
+                 "unit_id INTEGER REFERENCES units(id))")
+    conn.execute("CREATE TABLE lesson_components (id INTEGER PRIMARY KEY, name VARCHAR, type INTEGER, "
+                 "content VARCHAR, lesson_id INTEGER REFERENCES lessons(id))")
+    conn.executemany("INSERT INTO units (name) VALUES (?)", [(name,) for name in unit_names])
+    conn.commit()
+    conn.close()
+
+def index_names(path, table):
+    """Names of the indexes on a table"""
+    conn = sqlite3.connect(path)
+    names = {row[1] for row in conn.execute(f"PRAGMA index_list({table})")}
+    conn.close()
+    return names
+
+def test_unique_name_indexes_added(tmp_path):
+    """Test old databases gain the unique name indexes"""
+    path = str(tmp_path / "old_curriculum.db")
+    create_old_curriculum(path, ["Basics", "Sensors"])
+
+    runtime = DatabaseRuntime(path)
+    assert "0002_unique_names" in runtime.migrations_applied
+    assert "uq_units_name" in index_names(path, "units")
+    assert "uq_lessons_name" in index_names(path, "lessons")
+    assert "uq_lesson_components_name" in index_names(path, "lesson_components")
+
+def test_duplicate_names_stop_startup(tmp_path):
+    """Test the runtime refuses to start while duplicate names block the unique indexes"""
+    path = str(tmp_path / "duplicates.db")
+    create_old_curriculum(path, ["Basics", "Basics"])
+
+    with pytest.raises(MigrationError, match="units.name 'Basics' \\(2 rows\\)"):
+        DatabaseRuntime(path)
+    assert "uq_units_name" not in index_names(path, "units")
+
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE units SET name = 'Basics 2' WHERE id = 2")
+    conn.commit()
+    conn.close()
+    runtime = DatabaseRuntime(path)
+    assert "0002_unique_names" in runtime.migrations_applied
+    assert "uq_units_name" in index_names(path, "units")
+
+def test_foreign_key_indexes_added(tmp_path):
+    """Test old databases gain the unit_id, lesson_id and team_id indexes"""
+    path = str(tmp_path / "old_foreign_keys.db")
+    create_old_curriculum(path, ["Basics"])
+
+    assert "0003_foreign_key_indexes" in DatabaseRuntime(path).migrations_applied
+    assert "ix_lessons_unit_id" in index_names(path, "lessons")
+    assert "ix_lesson_components_lesson_id" in index_names(path, "lesson_components")
+    assert "ix_users_team_id" in index_names(path, "users")
+
+def test_curriculum_generation_added(tmp_path):
+    """Test old databases gain the generation table and the triggers that bump it"""
+    path = str(tmp_path / "old_generation.db")
+    create_old_curriculum(path, ["Basics"])
+
+    assert "0005_curriculum_generation" in DatabaseRuntime(path).migrations_applied
+    conn = sqlite3.connect(path)
+    generation = "SELECT COALESCE(MAX(generation), 0) FROM cache_generations WHERE name = 'curriculum'"
+    before = conn.execute(generation).fetchone()[0]
+    conn.execute("UPDATE units SET name = 'Renamed'")
+    conn.commit()
+    assert conn.execute(generation).fetchone()[0] == before + 1
+    conn.close()
+
+def test_updated_at_added(tmp_path):
+    """Test old curriculum rows gain an updated_at"""
+    path = str(tmp_path / "old_updated_at.db")
+    create_old_curriculum(path, ["Basics"])
+
+    assert "0006_updated_at" in DatabaseRuntime(path).migrations_applied
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT updated_at IS NOT NULL FROM units").fetchall() == [(1,)]
+    conn.close()
@@ -0,0 +1,48 @@
+import pytest
+import os
+import sys
+import sqlite3
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from models.db_runtime import get_runtime
+from models.orphans import main, remove_orphans
+
+@pytest.fixture
+def orphan_db(tmp_path):
+    """Database with a kept lesson and component plus orphans of each"""
+    path = str(tmp_path / "orphans.db")
+    get_runtime(path)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO units (id, name) VALUES (1, 'Basics')")
+    conn.execute("INSERT INTO lessons (id, name, unit_id) VALUES (1, 'Kept', 1), (2, 'Orphan', NULL), (3, 'Gone', 9)")
+    conn.execute("INSERT INTO lesson_components (id, name, type, content, lesson_id) VALUES "
+                 "(1, 'Kept', 1, '', 1), (2, 'In Orphan', 1, '', 2), (3, 'Missing', 1, '', 7)")
+    conn.commit()
+    conn.close()
+    return path
+
+def names(path, table):
+    """Names left in a table"""
+    conn = sqlite3.connect(path)
+    rows = [row[0] for row in conn.execute(f"SELECT name FROM {table} ORDER BY id")]
+    conn.close()
+    return rows
+
+def test_report_deletes_nothing(orphan_db):
+    """Test orphans are only listed without --delete"""
+    orphans = remove_orphans(orphan_db)
+
+    assert orphans == {"lessons": ["Orphan", "Gone"], "lesson_components": ["In Orphan", "Missing"]}
+    assert names(orphan_db, "lessons") == ["Kept", "Orphan", "Gone"]
+    assert names(orphan_db, "lesson_components") == ["Kept", "In Orphan", "Missing"]
+
+def test_delete_removes_reported_orphans(orphan_db, capsys):
+    """Test --delete removes exactly the rows it reports"""
+    assert main([orphan_db, "--delete"]) == 0
+
+    output = capsys.readouterr().out
+    assert "lessons: Gone" in output
+    assert "2 orphaned lesson_components deleted" in output
+    assert names(orphan_db, "lessons") == ["Kept"]
+    assert names(orphan_db, "lesson_components") == ["Kept"]
+    assert remove_orphans(orphan_db) == {"lessons": [], "lesson_components": []}
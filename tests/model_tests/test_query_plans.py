@@ -0,0 +1,35 @@
+import pytest
+import os
+import sys
+import sqlite3
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from models.db_runtime import DatabaseRuntime
+from models.query_plans import check, main, table_scans
+
+def test_table_scans():
+    """Test only full scans of real, unexpected tables are reported"""
+    assert table_scans(["SCAN lessons"]) == ["lessons"]
+    assert table_scans(["SCAN lessons_1"]) == ["lessons"]
+    assert table_scans(["SCAN units"], allowed=("units",)) == []
+    assert table_scans(["SCAN units USING COVERING INDEX uq_units_name"]) == []
+    assert table_scans(["SCAN lesson_components USING INDEX ix_lesson_components_lesson_id"]) == ["lesson_components"]
+    assert table_scans(["SCAN anon_1", "SEARCH lessons USING INTEGER PRIMARY KEY (rowid=?)"]) == []
+
+def test_current_schema_has_no_table_scans():
+    """Test every hot query is answered from an index"""
+    assert check() == []
+
+def test_missing_index_fails(tmp_path, capsys):
+    """Test the command fails on a database without the foreign key indexes"""
+    path = str(tmp_path / "no_index.db")
+    DatabaseRuntime(path).dispose()
+    conn = sqlite3.connect(path)
+    conn.execute("DROP INDEX ix_lessons_unit_id")
+    conn.commit()
+    conn.close()
+
+    failures = check(path)
+    assert any(failure.startswith("LessonModel.get_by_unit_id scans lessons") for failure in failures)
+    assert main([path]) == 1
+    assert "FAIL LessonModel.get_by_unit_id" in capsys.readouterr().out
@@ -1,5 +1,8 @@
 """Test the Flask server routes and middleware."""
 import pytest
+from flask import flash, get_flashed_messages, redirect
+import server
+from models import unit_of_work
 
 def test_index_page(client):
     """Test the index page is accessible to all users."""
@@ -98,3 +101,21 @@ def test_session_management(auth_client):
         assert 'user_email' in session
         assert session['user']['access'] == 3
         assert session['user']['team'] == 'phoenixes'
+
+def test_failed_commit_replaces_success_message(app, monkeypatch):
+    """Test a request whose COMMIT fails reports an error instead of success."""
+    def fail():
+        raise RuntimeError("database is locked")
+    monkeypatch.setattr(unit_of_work, 'commit', fail)
+
+    with app.test_request_context('/units/create', method='POST'):
+        flash('Unit created successfully', 'success')
+        response = server.commit_db_session(redirect('/units'))
+        assert response.status_code == 302
+        assert get_flashed_messages(with_categories=True) == [
+            ('error', 'Your changes could not be saved, please try again')
+        ]
+
+    with app.test_request_context('/units/create', method='POST'):
+        response = server.commit_db_session(app.response_class('Saved'))
+        assert response.status_code == 503
@@ -0,0 +1,57 @@
+import pytest
+import logging
+import os
+import sys
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from flask import Flask
+from models.db_runtime import DatabaseRuntime
+from models.sql_instrumentation import parameter_shape
+from models.unit_model import UnitModel
+
+@pytest.fixture(scope="function")
+def runtime(tmp_path):
+    """A runtime that treats every statement as slow"""
+    return DatabaseRuntime(str(tmp_path / "sql_test.db"), slow_query_ms=0)
+
+@pytest.fixture(scope="function")
+def unit(runtime):
+    """A unit model bound to the runtime"""
+    test_unit = UnitModel()
+    test_unit.initialize_DB(runtime=runtime)
+    runtime.instrumentation.reset()
+    return test_unit
+
+def test_parameter_shape():
+    """Test parameters are described by type, never by value"""
+    assert parameter_shape(("secret", 3)) == ["str", "int"]
+    assert parameter_shape({"name": "secret"}) == {"name": "str"}
+    assert parameter_shape([("a",), ("b",)], executemany=True) == {"rows": 2, "each": ["str"]}
+
+def test_queries_counted_per_endpoint(runtime, unit):
+    """Test statements are aggregated under the running endpoint"""
+    app = Flask(__name__)
+    app.add_url_rule('/units', 'units.view', view_func=lambda: '')
+    with app.test_request_context('/units'):
+        unit.get_all()
+        unit.get_all()
+
+    # Two generation checks, and one listing since the second is served from the cache
+    stats = runtime.instrumentation.snapshot('units.view')
+    assert stats["queries"] == 3
+    assert stats["total_ms"] > 0
+
+def test_queries_outside_request(runtime, unit):
+    """Test statements outside a request are still counted"""
+    unit.get_all()
+    assert runtime.instrumentation.snapshot('<no request>')["queries"] == 2
+
+def test_slow_queries_logged(runtime, unit, caplog):
+    """Test statements over the threshold are logged with their parameter shape"""
+    with caplog.at_level(logging.WARNING, logger="robosite.sql"):
+        unit.get(id=1)
+
+    record = caplog.records[-1]
+    assert "units" in record.statement
+    assert set(record.parameter_shape) == {"int"}
+    assert runtime.instrumentation.snapshot('<no request>')["slow_queries"] == 1
@@ -3,9 +3,9 @@ import os
 import sys
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, root_dir)
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
-from models.database import Base, Unit
+from models.database import Base, Unit, Lesson, LessonComponent
 from models import unit_model
 from test_data.sample_unit_data import SAMPLE_UNITS
 
@@ -139,4 +139,123 @@ def test_duplicate_unit_name(unit, setup_unit_data):
     result = unit.create("Test Unit")
     
     assert result["status"] == "error"
-    assert "exists" in result["data"].lower()
\ No newline at end of file
+    assert "exists" in result["data"].lower()
+
+def test_curriculum_tree(unit, engine, session, setup_unit_data):
+    """Test the units page tree is loaded without N+1 queries or component bodies"""
+    first_id = SAMPLE_UNITS[0]["id"]
+    for lesson_id in (101, 102):
+        session.add(Lesson(id=lesson_id, name=f"Lesson {lesson_id}", type=1, img="", unit_id=first_id))
+    session.add(LessonComponent(id=201, name="Video", type=2, content='{"url": "x"}', lesson_id=101))
+    session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    result = unit.get_curriculum_tree()
+
+    assert result["status"] == "success"
+    assert len(statements) == 3
+    assert "cache_generations" in statements[0]
+    assert all("content" not in sql for sql in statements)
+    assert len(result["data"]) == len(SAMPLE_UNITS)
+    tree = next(u for u in result["data"] if u["id"] == first_id)
+    assert [lesson["id"] for lesson in tree["lessons"]] == [101, 102]
+    assert tree["lessons"][0]["components"] == [{"id": 201, "name": "Video", "type": 2}]
+    assert tree["lessons"][1]["components"] == []
+
+def test_unit_fields_projection(unit, engine, setup_unit_data):
+    """Test fields= selects only the named columns"""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    result = unit.get_all(fields=("id",))
+    assert result["status"] == "success"
+    assert all(list(row) == ["id"] for row in result["data"])
+    assert len(statements) == 2
+    assert "units.name" not in statements[1] and "lessons" not in statements[1]
+
+    first = SAMPLE_UNITS[0]
+    assert unit.get(id=first["id"], fields=("name",))["data"] == {"name": first["name"].lower()}
+    assert unit.get(id=first["id"], fields=("bogus",))["status"] == "error"
+
+def test_create_is_single_insert(unit, engine, setup_unit_data):
+    """Test create relies on the unique index instead of an exists() query"""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert unit.create("Brand New Unit")["status"] == "success"
+    assert unit.create("Brand New Unit")["status"] == "error"
+    assert len(statements) == 2
+    assert all(sql.lstrip().upper().startswith("INSERT") for sql in statements)
+
+def test_update_is_single_statement(unit, engine, setup_unit_data):
+    """Test update writes and returns the unit in one UPDATE ... RETURNING"""
+    unit_id = unit.create("Rename Me")["data"]["id"]
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    result = unit.update({"id": unit_id, "name": "Renamed"})
+    assert result == {"status": "success", "data": {"name": "Renamed", "id": unit_id}}
+    assert unit.update({"id": 999, "name": "Nobody"})["status"] == "error"
+    assert len(statements) == 2
+    assert all(sql.lstrip().upper().startswith("UPDATE") for sql in statements)
+
+def test_remove_cascades(unit, engine, session, setup_unit_data):
+    """Test removing a unit deletes its lessons and their components in set-based statements"""
+    first_id, second_id = SAMPLE_UNITS[0]["id"], SAMPLE_UNITS[1]["id"]
+    session.add(Lesson(id=101, name="Lesson 101", type=1, img="", unit_id=first_id))
+    session.add(Lesson(id=102, name="Lesson 102", type=1, img="", unit_id=first_id))
+    session.add(Lesson(id=103, name="Lesson 103", type=1, img="", unit_id=second_id))
+    session.add(LessonComponent(id=201, name="Video", type=2, content="{}", lesson_id=101))
+    session.add(LessonComponent(id=202, name="Quiz", type=3, content="{}", lesson_id=103))
+    session.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    result = unit.remove(id=first_id)
+
+    assert result == {"status": "success", "data": {"lesson_components": 1, "lessons": 2, "units": 1}}
+    assert len(statements) == 3
+    assert all(sql.lstrip().upper().startswith("DELETE") for sql in statements)
+    session.expire_all()
+    assert [l.id for l in session.query(Lesson).all()] == [103]
+    assert [c.id for c in session.query(LessonComponent).all()] == [202]
+    assert unit.remove(id=first_id)["status"] == "error"
+
+def test_get_all_pages(unit, setup_unit_data):
+    """Test get_all walks the units in id order one keyset page at a time"""
+    for name in ("Page A", "Page B", "Page C"):
+        unit.create(name)
+    expected = [row["id"] for row in unit.get_all()["data"]]
+
+    seen, cursor = [], None
+    while True:
+        page = unit.get_all(fields=("name",), limit=2, cursor=cursor)
+        assert page["status"] == "success" and len(page["data"]) <= 2
+        assert all(list(row) == ["name"] for row in page["data"])
+        seen += [row["name"] for row in page["data"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [row["name"] for row in unit.get_all()["data"]]
+    assert len(seen) == len(expected)
+
+    first = unit.get_all(limit=2)
+    assert [row["id"] for row in first["data"]] == expected[:2]
+    assert unit.get_all(limit=2, cursor="not-a-cursor")["status"] == "error"
+    assert unit.get_all(limit=0)["status"] == "error"
+
+def test_get_many(unit, engine, setup_unit_data):
+    """Test get_many resolves several ids with one IN query"""
+    ids = [row["id"] for row in SAMPLE_UNITS[:2]]
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    result = unit.get_many(ids + [ids[0], 999])
+
+    assert result["status"] == "success"
+    assert set(result["data"]) == set(ids)
+    assert result["data"][ids[0]] == {"id": ids[0], "name": SAMPLE_UNITS[0]["name"].lower()}
+    assert len(statements) == 1 and " IN " in statements[0]
+    assert unit.get_many(ids, fields=("name",))["data"][ids[1]] == {"name": SAMPLE_UNITS[1]["name"].lower()}
+    assert unit.get_many([])["data"] == {}
@@ -0,0 +1,151 @@
+import pytest
+import os
+import sys
+import sqlite3
+import threading
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from flask import Flask, g
+from sqlalchemy import event
+from models import unit_of_work
+from models.db_runtime import DatabaseRuntime
+from models.unit_model import UnitModel
+from models.lesson_model import LessonModel
+
+@pytest.fixture(scope="function")
+def runtime(tmp_path):
+    """Create a fresh runtime on a file database for each test"""
+    return DatabaseRuntime(str(tmp_path / "uow_test.db"))
+
+@pytest.fixture(scope="function")
+def models(runtime):
+    """Unit and lesson models bound to the same runtime"""
+    unit = UnitModel()
+    lesson = LessonModel()
+    unit.initialize_DB(runtime=runtime)
+    lesson.initialize_DB(runtime=runtime)
+    return unit, lesson
+
+@pytest.fixture(scope="function")
+def app():
+    """A bare Flask app to provide request contexts"""
+    return Flask(__name__)
+
+def test_models_share_request_session(app, models):
+    """Test every model call in a request uses one session"""
+    unit, lesson = models
+    with app.test_request_context('/'):
+        unit.get_all()
+        lesson.get_all()
+        assert len(g.db_sessions) == 1
+        unit_of_work.finish()
+
+def test_request_commits_once(app, models, runtime):
+    """Test writes in a request are committed once, by commit()"""
+    unit, lesson = models
+    commits = []
+    event.listen(runtime.engine, "commit", lambda conn: commits.append(conn))
+
+    with app.test_request_context('/'):
+        created = unit.create("Request Unit")
+        assert created["status"] == "success"
+        lesson.create({"name": "Request Lesson", "unit_id": created["data"]["id"]})
+        assert commits == []
+        unit_of_work.commit()
+        unit_of_work.finish()
+
+    assert len(commits) == 1
+    assert unit.get(unit="Request Unit")["status"] == "success"
+    assert lesson.exists(lesson="Request Lesson")["data"] is True
+
+def test_request_rolls_back_on_error(app, models):
+    """Test a failed request discards its writes"""
+    unit, lesson = models
+    with app.test_request_context('/'):
+        unit.create("Doomed Unit")
+        unit_of_work.finish(RuntimeError("request failed"))
+
+    assert unit.get(unit="Doomed Unit")["status"] == "error"
+
+def test_outside_request_commits_immediately(models):
+    """Test model calls outside a request still commit on their own"""
+    unit, lesson = models
+    unit.create("Standalone Unit")
+    assert unit.get(unit="Standalone Unit")["status"] == "success"
+
+def test_read_only_endpoints_use_reader_pool(app, models, runtime):
+    """Test registered read-only endpoints run on the mode=ro pool"""
+    unit, lesson = models
+    unit.create("Existing Unit")
+    app.add_url_rule('/units', 'units.view', view_func=lambda: '')
+    unit_of_work.mark_read_only('units.view')
+
+    with app.test_request_context('/units'):
+        assert unit.get_all()["data"][0]["name"] == "Existing Unit"
+        assert list(g.db_sessions) == [runtime.ReadSession]
+        # Writes are refused on a read-only connection
+        assert unit.create("Sneaky Unit")["status"] == "error"
+        unit_of_work.finish()
+
+    assert unit.exists(unit="Sneaky Unit")["data"] is False
+
+def test_writes_use_writer_pool(app, models, runtime):
+    """Test non read-only requests run on the writer pool"""
+    unit, lesson = models
+    app.add_url_rule('/units/create', 'units.create', view_func=lambda: '', methods=['POST'])
+
+    with app.test_request_context('/units/create', method='POST'):
+        assert unit.create("Written Unit")["status"] == "success"
+        assert list(g.db_sessions) == [runtime.Session]
+        unit_of_work.commit()
+        unit_of_work.finish()
+
+def open_reader(path):
+    """A second connection holding a read lock, which keeps a COMMIT from finishing"""
+    reader = sqlite3.connect(path, timeout=0, isolation_level=None, check_same_thread=False)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM units").fetchone()
+    return reader
+
+@pytest.fixture(scope="function")
+def default_runtime(tmp_path):
+    """A runtime on the plain SQLite profile (rollback journal) that never waits on a lock"""
+    runtime = DatabaseRuntime(str(tmp_path / "uow_default.db"), pragma_profile="default")
+    # The sqlite3 driver waits 5 seconds by default; report a lock as busy at once
+    runtime.pragmas = {"busy_timeout": 0}
+    runtime.engine.dispose()
+    runtime.writer.base_delay_ms = runtime.writer.max_delay_ms = 20
+    return runtime
+
+def test_busy_commit_is_retried(app, default_runtime, tmp_path):
+    """Test a COMMIT blocked by a reader succeeds once the reader is done"""
+    unit = UnitModel()
+    unit.initialize_DB(runtime=default_runtime)
+
+    with app.test_request_context('/', method='POST'):
+        assert unit.create("Patient Unit")["status"] == "success"
+        reader = open_reader(str(tmp_path / "uow_default.db"))
+        threading.Timer(0.05, reader.close).start()
+        unit_of_work.commit()
+        unit_of_work.finish()
+
+    assert default_runtime.writer.stats()["retries"] >= 1
+    assert unit.exists(unit="Patient Unit")["data"] is True
+
+def test_failed_commit_raises_and_rolls_back(app, default_runtime, tmp_path):
+    """Test a COMMIT that stays blocked is reported, not swallowed"""
+    unit = UnitModel()
+    unit.initialize_DB(runtime=default_runtime)
+    default_runtime.writer.max_retries = 1
+
+    with app.test_request_context('/', method='POST'):
+        unit.create("Lost Unit")
+        reader = open_reader(str(tmp_path / "uow_default.db"))
+        try:
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                unit_of_work.commit()
+        finally:
+            reader.close()
+        unit_of_work.finish()
+
+    assert unit.exists(unit="Lost Unit")["data"] is False
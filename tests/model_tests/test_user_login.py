@@ -0,0 +1,76 @@
+import pytest
+import os
+import sys
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from sqlalchemy import event
+from models.db_runtime import DatabaseRuntime
+from models.team_model import TeamModel
+from models.user_model import UserModel
+
+@pytest.fixture(scope="function")
+def user(tmp_path):
+    """A user model with the default teams in place"""
+    runtime = DatabaseRuntime(str(tmp_path / "login_test.db"))
+    user_model = UserModel()
+    user_model.initialize_DB(runtime=runtime)
+    team_model = TeamModel(user_model)
+    team_model.initialize_DB(runtime=runtime)
+    for name in ("phoenixes", "pigeons", "teachers"):
+        team_model.create(name)
+    return user_model
+
+def count_statements(user):
+    """Record every statement sent on the user model's engine"""
+    statements = []
+    event.listen(user.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def test_upsert_creates_user_with_team_name(user):
+    """Test a first login inserts the user and returns the team name in one statement"""
+    statements = count_statements(user)
+    result = user.upsert({"google_id": "g1", "name": "New", "email": "new@example.com",
+                          "team_id": 2, "access": 2})
+
+    assert result["status"] == "success"
+    assert result["data"] == {"google_id": "g1", "name": "New", "email": "new@example.com",
+                              "access": 2, "team_id": 2, "team_name": "pigeons", "auth_epoch": 0}
+    assert len(statements) == 1
+
+def test_upsert_keeps_team_and_access(user):
+    """Test logging in again refreshes the name but keeps team and access"""
+    user.create({"google_id": "placeholder", "name": "Admin", "email": "admin@example.com",
+                 "team_id": 3, "access": 3})
+
+    result = user.upsert({"google_id": "real-id", "name": "Admin Renamed", "email": "admin@example.com",
+                          "team_id": 2, "access": 2})
+
+    assert result["status"] == "success"
+    assert result["data"]["google_id"] == "real-id"
+    assert result["data"]["name"] == "Admin Renamed"
+    assert result["data"]["access"] == 3
+    assert result["data"]["team_name"] == "teachers"
+    assert len(user.get_all()["data"]) == 1
+
+def test_upsert_team_name_is_the_users_own(user):
+    """Test the returned team name belongs to the upserted user when other users exist"""
+    user.create({"google_id": "p1", "name": "Phoenix", "email": "phoenix@example.com", "team_id": 1})
+    user.create({"google_id": "t1", "name": "Teacher", "email": "teacher@example.com",
+                 "team_id": 3, "access": 3})
+
+    created = user.upsert({"google_id": "g1", "name": "New", "email": "new@example.com", "team_id": 2})
+    existing = user.upsert({"google_id": "t2", "name": "Teacher", "email": "teacher@example.com", "team_id": 2})
+
+    assert created["data"]["team_name"] == "pigeons"
+    assert existing["data"]["team_id"] == 3
+    assert existing["data"]["team_name"] == "teachers"
+
+def test_upsert_requires_identity(user):
+    """Test google_id and email are required"""
+    assert user.upsert({"name": "Nobody"})["status"] == "error"
+
+def test_exists_by_google_id(user):
+    """Test exists(google_id=...) looks the user up by Google ID"""
+    user.upsert({"google_id": "g1", "name": "New", "email": "new@example.com"})
+    assert user.exists(google_id="g1")["data"] is True
+    assert user.exists(google_id="g2")["data"] is False
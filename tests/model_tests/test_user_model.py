@@ -285,4 +285,13 @@ def test_access_level_validation(user, setup_user_data):
         db_user = session.query(User).filter_by(email="invalid@robotics.com").first()
         assert db_user is None
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+def test_user_fields_projection(user, setup_user_data):
+    """Test fields= can include the team name through a join"""
+    result = user.get(email="captain@robotics.com", fields=("email", "team_name"))
+    assert result["status"] == "success"
+    assert result["data"] == {"email": "captain@robotics.com", "team_name": "phoenixes"}
+
+    rows = user.get_all(fields=("email",))["data"]
+    assert all(list(row) == ["email"] for row in rows)
@@ -0,0 +1,60 @@
+import pytest
+import os
+import sys
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from sqlalchemy import event
+from models.db_runtime import DatabaseRuntime
+from models.team_model import TeamModel
+from models.user_model import UserModel
+
+@pytest.fixture(scope="function")
+def user(tmp_path):
+    """A user model with the default teams in place"""
+    runtime = DatabaseRuntime(str(tmp_path / "queries_test.db"))
+    user_model = UserModel()
+    user_model.initialize_DB(runtime=runtime)
+    team_model = TeamModel(user_model)
+    team_model.initialize_DB(runtime=runtime)
+    for name in ("phoenixes", "pigeons", "teachers"):
+        team_model.create(name)
+    return user_model
+
+def count_statements(user):
+    """Record every statement sent on the user model's engine"""
+    statements = []
+    event.listen(user.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def test_update_bumps_epoch_only_on_change(user):
+    """Test update by email is one statement and counts only real access/team changes"""
+    user.upsert({"google_id": "g1", "name": "New", "email": "new@example.com", "team_id": 2, "access": 2})
+    statements = count_statements(user)
+
+    same = user.update({"email": "new@example.com", "team_id": 2, "access": 2})
+    moved = user.update({"email": "new@example.com", "team_id": 1})
+
+    assert same["data"]["auth_epoch"] == 0
+    assert moved["data"]["auth_epoch"] == 1
+    assert moved["data"]["team_id"] == 1 and moved["data"]["access"] == 2
+    assert len(statements) == 2
+    assert user.update({"email": "missing@example.com", "name": "X"})["status"] == "error"
+
+def test_get_all_pages_by_email(user):
+    """Test the user listing is paged by email with an opaque cursor"""
+    for i in (3, 1, 2):
+        user.upsert({"google_id": f"g{i}", "name": f"User {i}", "email": f"user{i}@example.com"})
+
+    first = user.get_all(fields=("email",), limit=2)
+    assert [row["email"] for row in first["data"]] == ["user1@example.com", "user2@example.com"]
+    second = user.get_all(fields=("email",), limit=2, cursor=first["next_cursor"])
+    assert second == {"status": "success", "data": [{"email": "user3@example.com"}], "next_cursor": None}
+
+def test_get_many_by_google_id(user):
+    """Test get_many is keyed by google_id and can join the team name"""
+    user.upsert({"google_id": "g1", "name": "One", "email": "one@example.com", "team_id": 1})
+    user.upsert({"google_id": "g2", "name": "Two", "email": "two@example.com", "team_id": 2})
+
+    result = user.get_many(["g1", "g2", "g3"], fields=("email", "team_name"))
+    assert result["data"] == {"g1": {"email": "one@example.com", "team_name": "phoenixes"},
+                              "g2": {"email": "two@example.com", "team_name": "pigeons"}}
@@ -0,0 +1,134 @@
+import pytest
+import os
+import sys
+import sqlite3
+import threading
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, root_dir)
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+from models import unit_of_work
+from models.db_runtime import DatabaseRuntime
+from models.unit_model import UnitModel
+from models.write_queue import SerializedWriter, WriteQueueFull, is_busy_error
+
+def busy_error():
+    """An OperationalError as SQLAlchemy raises it for a locked database"""
+    return OperationalError("INSERT", {}, sqlite3.OperationalError("database is locked"))
+
+@pytest.fixture(scope="function")
+def writer():
+    """A writer with no real backoff so retries are instant"""
+    return SerializedWriter(max_queue=2, queue_timeout=1, max_retries=3,
+                            base_delay_ms=0, max_delay_ms=0)
+
+@pytest.fixture(scope="function")
+def unit_model(tmp_path):
+    """A unit model on its own runtime"""
+    model = UnitModel()
+    model.initialize_DB(runtime=DatabaseRuntime(str(tmp_path / "write_queue_test.db")))
+    return model
+
+def test_is_busy_error():
+    """Test only locked/busy errors are treated as retryable"""
+    assert is_busy_error(busy_error())
+    assert is_busy_error(sqlite3.OperationalError("database is locked"))
+    assert not is_busy_error(sqlite3.OperationalError("no such table: units"))
+    assert not is_busy_error(ValueError("database is locked"))
+
+def test_busy_write_is_retried(writer):
+    """Test a write that hits SQLITE_BUSY is retried until it succeeds"""
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise busy_error()
+        return "done"
+
+    with writer.slot():
+        assert writer.run(operation) == "done"
+    stats = writer.stats()
+    assert len(attempts) == 3
+    assert stats["retries"] == 2
+    assert stats["writes"] == 1
+    assert stats["busy_failures"] == 0
+
+def test_busy_write_gives_up(writer):
+    """Test a write that stays busy fails after max_retries"""
+    def operation():
+        raise busy_error()
+
+    with writer.slot():
+        with pytest.raises(OperationalError):
+            writer.run(operation)
+    assert writer.stats()["retries"] == 3
+    assert writer.stats()["busy_failures"] == 1
+
+def test_other_errors_are_not_retried(writer):
+    """Test non-busy errors are raised straight away"""
+    with writer.slot():
+        with pytest.raises(ValueError):
+            writer.run(lambda: (_ for _ in ()).throw(ValueError("bad")))
+    assert writer.stats()["retries"] == 0
+
+def test_full_queue_rejects_writers():
+    """Test writers are rejected instead of queueing without bound"""
+    writer = SerializedWriter(max_queue=0, queue_timeout=1, max_retries=0,
+                              base_delay_ms=0, max_delay_ms=0)
+    with pytest.raises(WriteQueueFull):
+        writer.acquire()
+    assert writer.stats()["rejected"] == 1
+
+def test_waiting_writer_times_out():
+    """Test a writer gives up when the slot is held for too long"""
+    writer = SerializedWriter(max_queue=2, queue_timeout=0.05, max_retries=0,
+                              base_delay_ms=0, max_delay_ms=0)
+    holding = threading.Event()
+    done = threading.Event()
+
+    def hold():
+        with writer.slot():
+            holding.set()
+            done.wait(1)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    holding.wait(1)
+    try:
+        with pytest.raises(WriteQueueFull):
+            writer.acquire()
+    finally:
+        done.set()
+        thread.join()
+    assert writer.stats()["queue_depth"] == 0
+
+def test_model_write_goes_through_writer(unit_model):
+    """Test model writes are counted by the runtime's writer"""
+    assert unit_model.create("Queued Unit")["status"] == "success"
+    assert unit_model.runtime.writer.stats()["writes"] == 1
+    assert unit_model.runtime.metrics()["writer"]["writes"] == 1
+
+def test_model_write_rejected_when_queue_full(unit_model):
+    """Test a rejected write is reported as an error result"""
+    unit_model.runtime.writer.max_queue = 0
+    result = unit_model.create("Rejected Unit")
+    assert result["status"] == "error"
+    assert result["data"] == "The database is busy, please try again"
+
+def test_request_holds_writer_until_finish(unit_model):
+    """Test a request keeps the writer slot until its transaction is committed"""
+    app = Flask(__name__)
+    writer = unit_model.runtime.writer
+
+    with app.test_request_context('/', method='POST'):
+        unit_model.create("First Unit")
+        unit_model.create("Second Unit")
+        assert writer._slot._is_owned()
+        unit_of_work.commit()
+        unit_of_work.finish()
+        assert not writer._slot._is_owned()
+
+    # Two creates and the request's COMMIT
+    assert writer.stats()["writes"] == 3
+    assert unit_model.exists(unit="Second Unit")["data"] is True